@@ -8,27 +8,62 @@ This server enables external systems (like JobsMatch) to:
 - Receive callbacks when portfolios are updated
 
 Usage:
-    python api_server.py
+    python api_server.py            # gunicorn + gevent worker (gunicorn.conf.py)
+    DEBUG=true python api_server.py # Flask development server
 
 API Endpoints:
     POST /api/generate - Generate a new portfolio
     GET /api/portfolio/<portfolio_id> - Get portfolio data
     PUT /api/portfolio/<portfolio_id> - Update portfolio
+    GET /progress/<job_id> - Stream background generation progress (SSE)
     GET /editor - Serve manual editor
     GET /editor/<portfolio_id> - Serve editor with pre-filled data
 """
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
+from flask_compress import Compress
 from flask_cors import CORS
+from flask_orjson import OrjsonProvider
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from werkzeug.security import safe_join
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-import json
+import atexit
+import hashlib
+import msgspec
+import orjson
 import os
+import requests
+import queue
+import sqlite3
+import stat
+import sys
+import tempfile
+import threading
+import time
+import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from urllib.parse import quote
+from typing import Dict, Any, Iterator, List, Literal, Optional, Tuple
 
-from generate_portfolio import generate_portfolio, mark_site_validated, generate_astro_portfolio
+from generate_portfolio import (
+    build_site_data,
+    generate_astro_portfolio,
+    generate_portfolio,
+    mark_site_validated,
+    normalize_input_payload,
+    safe_dir_name,
+    warm_template_cache,
+)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Load the portfolio template now so the first request doesn't pay for it
+warm_template_cache()
 
 # Configure CORS: restrict to specific routes and allow origins via env var
 _allowed_origins_env = os.getenv("API_ALLOWED_ORIGINS")
@@ -46,12 +81,382 @@ CORS(
     },
 )
 
+# Negotiate br/gzip for JSON and text bodies. Streamed responses (SSE
+# progress, files) are left alone so events are not held in a compressor.
+app.config["COMPRESS_MIMETYPES"] = ["application/json", "text/html", "text/css", "application/javascript"]
+app.config["COMPRESS_LEVEL"] = 4
+app.config["COMPRESS_MIN_SIZE"] = 1024
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.config["COMPRESS_STREAMS"] = False
+Compress(app)
+
 # Configuration
 PORTFOLIOS_DIR = Path(os.getenv("PORTFOLIOS_DIR", "generated_portfolios"))
 PORTFOLIOS_DIR.mkdir(exist_ok=True)
 
-# In-memory portfolio registry (use database in production)
-PORTFOLIO_REGISTRY: Dict[str, Dict[str, Any]] = {}
+# Static portfolio files can be handed off to the front web server so no
+# Python worker streams them: X-Sendfile (Apache mod_xsendfile, lighttpd) or
+# X-Accel-Redirect to an internal nginx location aliasing PORTFOLIOS_DIR.
+app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
+X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX", "")
+
+# The editor is a small static page fetched on every edit session; keep it in
+# memory so serving it costs no stat/open, and let clients revalidate by ETag.
+EDITOR_PATH = Path(__file__).resolve().parent / "manual_editor.html"
+EDITOR_BYTES = EDITOR_PATH.read_bytes() if EDITOR_PATH.exists() else None
+EDITOR_ETAG = hashlib.md5(EDITOR_BYTES).hexdigest() if EDITOR_BYTES is not None else None
+EDITOR_MAX_AGE = 300
+
+
+# Request validation. The literals mirror TEMPLATE_MODES and DESIGN_THEME_FILES
+# of generate_portfolio, spelled out so type checkers can read them.
+SiteTemplate = Literal["cv", "hybrid", "portfolio"]
+DesignTheme = Literal["artistic", "classic", "contrast", "modern"]
+
+
+class GenerateOptions(msgspec.Struct):
+    """Control fields of a generation request; all other fields are portfolio data."""
+    user_id: Optional[str] = None
+    site_template: SiteTemplate = "hybrid"
+    design_theme: DesignTheme = "classic"
+    callback_url: Optional[str] = None
+    run_async: bool = msgspec.field(default=False, name="async")
+
+
+# Request-only fields of POST /api/generate[-astro], never passed to the generator
+GENERATE_CONTROL_FIELDS = frozenset({"site_template", "design_theme", "callback_url", "async"})
+
+
+class UpdateOptions(msgspec.Struct):
+    """Control fields of an update request; all other fields are portfolio data."""
+    regenerate: bool = True
+    full_replace: bool = False
+    sync: bool = False
+
+
+class PortfolioRegistry(MutableMapping):
+    """
+    SQLite-backed mapping of portfolio_id -> registry entry.
+    
+    The database file is shared by every worker process, so a portfolio
+    created by one gunicorn worker is visible to all of them and survives
+    restarts. The connection is opened lazily so that it is created after
+    the worker fork.
+    """
+    
+    COLUMNS: List[str] = [
+        "portfolio_id",
+        "user_id",
+        "path",
+        "type",
+        "site_template",
+        "design_theme",
+        "created_at",
+        "callback_url",
+    ]
+    
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    connection = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+                    connection.row_factory = sqlite3.Row
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute("PRAGMA synchronous=NORMAL")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS registry ("
+                        "portfolio_id TEXT PRIMARY KEY, user_id TEXT, path TEXT, type TEXT, "
+                        "site_template TEXT, design_theme TEXT, created_at TEXT, callback_url TEXT)"
+                    )
+                    self._connection = connection
+        return self._connection
+    
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        connection = self.connection
+        with self._lock:
+            return connection.execute(sql, params).fetchall()
+    
+    @staticmethod
+    def _to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = dict(row)
+        # Static portfolios are stored without a type, as before
+        if entry["type"] is None:
+            del entry["type"]
+        return entry
+    
+    def __getitem__(self, portfolio_id: str) -> Dict[str, Any]:
+        rows = self._execute("SELECT * FROM registry WHERE portfolio_id = ?", (portfolio_id,))
+        if not rows:
+            raise KeyError(portfolio_id)
+        return self._to_entry(rows[0])
+    
+    def __setitem__(self, portfolio_id: str, entry: Dict[str, Any]) -> None:
+        values = {**entry, "portfolio_id": portfolio_id}
+        self._execute(
+            f"INSERT OR REPLACE INTO registry ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in self.COLUMNS)})",
+            tuple(values.get(column) for column in self.COLUMNS),
+        )
+    
+    def __delitem__(self, portfolio_id: str) -> None:
+        if portfolio_id not in self:
+            raise KeyError(portfolio_id)
+        self._execute("DELETE FROM registry WHERE portfolio_id = ?", (portfolio_id,))
+    
+    def __contains__(self, portfolio_id: object) -> bool:
+        return bool(self._execute("SELECT 1 FROM registry WHERE portfolio_id = ? LIMIT 1", (portfolio_id,)))
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter([row["portfolio_id"] for row in self._execute("SELECT portfolio_id FROM registry")])
+    
+    def __len__(self) -> int:
+        return self._execute("SELECT COUNT(*) FROM registry")[0][0]
+    
+    def clear(self) -> None:
+        self._execute("DELETE FROM registry")
+
+
+# Portfolio registry shared by all worker processes. Kept outside
+# PORTFOLIOS_DIR, which is publicly served under /portfolios/.
+PORTFOLIO_REGISTRY = PortfolioRegistry(Path(os.getenv("PORTFOLIO_REGISTRY_DB", "portfolio_registry.db")))
+
+# Callback POSTs are network-bound: run them off the request thread so a slow
+# webhook receiver never holds a worker slot. A shared session keeps
+# connections (and TLS sessions) alive between callbacks to the same host.
+# Only connection failures are retried: once the request may have reached the
+# receiver (read timeout, 5xx), replaying it could deliver the callback twice.
+CALLBACK_TIMEOUT = float(os.getenv("CALLBACK_TIMEOUT", "10"))
+CALLBACK_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="portfolio-callback")
+CALLBACK_SESSION = requests.Session()
+_callback_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, connect=3, read=0, status=0, other=0, backoff_factor=0.3),
+)
+CALLBACK_SESSION.mount("https://", _callback_adapter)
+CALLBACK_SESSION.mount("http://", _callback_adapter)
+
+
+def _post_callback(callback_url: str, payload: Dict[str, Any]) -> None:
+    """POST a JSON payload to a callback URL, ignoring delivery failures."""
+    try:
+        CALLBACK_SESSION.post(
+            callback_url,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=CALLBACK_TIMEOUT,
+        ).close()
+    except Exception as error:  # pragma: no cover - depends on remote availability
+        app.logger.warning("Callback to %s failed: %s", callback_url, error)
+
+
+def _send_callback(callback_url: Optional[str], payload: Dict[str, Any]) -> None:
+    """Fire-and-forget delivery of a callback notification."""
+    if callback_url and callback_url.startswith(("http://", "https://")):
+        CALLBACK_EXECUTOR.submit(_post_callback, callback_url, payload)
+
+
+class PortfolioWriter:
+    """
+    Background writer coalescing rewrites of portfolio data files.
+    
+    Updates record the latest document per file and return immediately; a
+    single writer thread waits WRITE_COALESCE_SECONDS after the first
+    pending update and then writes (and fsyncs) each file once, however
+    many updates arrived in between. Pending documents are visible through
+    pending() so reads in this process always see the latest update.
+    """
+    
+    def __init__(self, coalesce_seconds: float):
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._condition = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    @staticmethod
+    def _write(path: str, data: Dict[str, Any]) -> None:
+        # Write a sibling temp file and rename it over the target: a crash
+        # mid-write leaves the previous portfolio.json intact, never a truncated one
+        directory, name = os.path.split(path)
+        with tempfile.NamedTemporaryFile("wb", dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False) as f:
+            try:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                f.flush()
+                os.fsync(f.fileno())
+                # Temp files are private (0600); keep the served file's permissions
+                try:
+                    os.chmod(f.name, stat.S_IMODE(os.stat(path).st_mode))
+                except FileNotFoundError:
+                    os.chmod(f.name, 0o644)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        os.replace(f.name, path)
+    
+    def submit(self, path: Path, data: Dict[str, Any]) -> None:
+        """Queue ``data`` as the next content of ``path``, replacing any pending one."""
+        with self._condition:
+            self._pending[str(path)] = data
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="portfolio-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+    
+    def pending(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Return the not-yet-written document for ``path``, if any."""
+        with self._condition:
+            return self._pending.get(str(path))
+    
+    def flush(self, path: Optional[Path] = None) -> None:
+        """Synchronously write the pending document for ``path`` (or all files)."""
+        with self._io_lock:
+            with self._condition:
+                if path is None:
+                    batch = dict(self._pending)
+                else:
+                    data = self._pending.get(str(path))
+                    batch = {str(path): data} if data is not None else {}
+            for pending_path, data in batch.items():
+                try:
+                    self._write(pending_path, data)
+                finally:
+                    # Entries stay visible to pending() until the file is replaced,
+                    # so a merge during the write never reads the stale copy; an
+                    # update submitted meanwhile is kept for the next flush
+                    with self._condition:
+                        if self._pending.get(pending_path) is data:
+                            del self._pending[pending_path]
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+            # Let a burst of updates accumulate before touching the disk
+            time.sleep(self.coalesce_seconds)
+            try:
+                self.flush()
+            except Exception as error:  # pragma: no cover - depends on filesystem state
+                app.logger.error("Writing portfolio data failed: %s", error)
+
+
+PORTFOLIO_WRITER = PortfolioWriter(float(os.getenv("WRITE_COALESCE_SECONDS", "0.1")))
+atexit.register(PORTFOLIO_WRITER.flush)
+
+
+@lru_cache(maxsize=512)
+def _read_portfolio_cached(path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Read a portfolio data file, memoized on its stat signature.
+    
+    Any rewrite of the file changes (mtime_ns, size), so stale entries are
+    never returned and simply age out of the LRU.
+    """
+    return Path(path).read_bytes()
+
+
+# Background generation jobs: each job pushes progress events into its own
+# queue, which /progress/<job_id> drains as Server-Sent Events.
+JOB_QUEUES: Dict[str, "queue.Queue[Dict[str, Any]]"] = {}
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="portfolio-generate")
+PROGRESS_TIMEOUT = 120
+PROGRESS_HEARTBEAT_INTERVAL = 15
+# Finished jobs keep their events for late subscribers, then are dropped
+# whether or not anyone streamed them (e.g. callback_url-only clients).
+# Expiry is checked lazily, when a job is submitted or its stream opened:
+# no thread sleeps per job.
+JOB_QUEUE_TTL = 600
+JOB_EXPIRES: Dict[str, float] = {}
+
+
+def _finish_job(job_id: str) -> None:
+    """Start the TTL of a job whose generation has completed."""
+    JOB_EXPIRES[job_id] = time.monotonic() + JOB_QUEUE_TTL
+
+
+def _expire_jobs() -> None:
+    """Drop the queues of finished jobs older than JOB_QUEUE_TTL."""
+    now = time.monotonic()
+    for job_id, expires_at in list(JOB_EXPIRES.items()):
+        if expires_at <= now:
+            JOB_EXPIRES.pop(job_id, None)
+            JOB_QUEUES.pop(job_id, None)
+
+
+def _register_portfolio(
+    result: Dict[str, Any],
+    user_id: str,
+    site_template: str,
+    design_theme: str,
+    callback_url: Optional[str],
+    created_at: datetime,
+) -> Dict[str, Any]:
+    """Register a generated static portfolio and build its API response."""
+    portfolio_id = result["portfolio_id"]
+    
+    PORTFOLIO_REGISTRY[portfolio_id] = {
+        "portfolio_id": portfolio_id,
+        "user_id": user_id,
+        "path": result["path"],
+        "site_template": site_template,
+        "design_theme": design_theme,
+        "created_at": created_at.isoformat(),
+        "callback_url": callback_url
+    }
+    
+    portfolio_dirname = Path(result["path"]).name
+    return {
+        "success": True,
+        "portfolio_id": portfolio_id,
+        "portfolio_url": f"/portfolios/{portfolio_dirname}/index.html",
+        "editor_url": f"/editor/{portfolio_id}",
+        "admin_url": f"/portfolios/{portfolio_dirname}/admin/",
+        "data_url": f"/api/portfolio/{portfolio_id}",
+        "site_template": site_template,
+        "design_theme": design_theme
+    }
+
+
+def _run_generate(
+    job_queue: "queue.Queue[Dict[str, Any]]",
+    portfolio_data: Dict[str, Any],
+    output_dir: str,
+    user_id: str,
+    site_template: str,
+    design_theme: str,
+    callback_url: Optional[str],
+    created_at: datetime,
+) -> None:
+    """
+    Generate a portfolio in a worker thread, reporting progress to the job queue.
+    
+    The queue is passed in rather than looked up in JOB_QUEUES: the job must
+    run to completion (files, registry, callback) even if its progress stream
+    was already closed and released the queue before the job started.
+    """
+    try:
+        result = generate_portfolio(
+            portfolio_data,
+            output_dir=output_dir,
+            site_template=site_template,
+            design_theme=design_theme,
+            progress=lambda stage, pct: job_queue.put({"type": "progress", "stage": stage, "pct": pct}),
+        )
+        response = _register_portfolio(
+            result, user_id, site_template, design_theme, callback_url, created_at
+        )
+        _send_callback(callback_url, response)
+        job_queue.put({"type": "done", **response})
+    except Exception as e:
+        job_queue.put({"type": "error", "error": str(e)})
 
 
 @app.route("/health", methods=["GET"])
@@ -60,6 +465,80 @@ def health_check():
     return jsonify({"status": "healthy", "service": "portfolio-generator-api"})
 
 
+def _generate_portfolio(data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Validate a generate request body and create the portfolio (or queue it)."""
+    # Extract and validate configuration
+    try:
+        options = msgspec.convert(data, GenerateOptions)
+    except msgspec.ValidationError as e:
+        return {"error": f"Invalid request: {e}"}, 400
+    user_id = options.user_id or ""
+    site_template = options.site_template
+    design_theme = options.design_theme
+    callback_url = options.callback_url
+    run_async = options.run_async
+    
+    # Remove config fields from portfolio data
+    portfolio_data = {k: v for k, v in data.items() if k not in GENERATE_CONTROL_FIELDS}
+    
+    # Sanitize user_id and build safe output directory
+    portfolios_root = PORTFOLIOS_DIR.resolve()
+    # One clock read serves both the directory suffix and created_at
+    now = datetime.now(timezone.utc)
+    
+    # Allow only safe characters in user_id to avoid path traversal
+    safe_user_id = safe_dir_name(user_id)
+    dir_name = safe_user_id or f"portfolio-{now.strftime('%Y%m%d-%H%M%S')}"
+    
+    candidate_output_dir = portfolios_root / dir_name
+    output_dir_resolved = candidate_output_dir.resolve()
+    
+    # Ensure the resolved output directory is under the configured portfolios root
+    try:
+        output_dir_resolved.relative_to(portfolios_root)
+    except ValueError:
+        return {"error": "Invalid user_id or output directory"}, 400
+    
+    if run_async:
+        # Hand off to a worker thread; progress is streamed on /progress/<job_id>
+        _expire_jobs()
+        job_id = str(uuid.uuid4())
+        JOB_QUEUES[job_id] = job_queue = queue.Queue()
+        future = JOB_EXECUTOR.submit(
+            _run_generate,
+            job_queue,
+            portfolio_data,
+            str(output_dir_resolved),
+            user_id,
+            site_template,
+            design_theme,
+            callback_url,
+            now,
+        )
+        future.add_done_callback(lambda _: _finish_job(job_id))
+        return {
+            "success": True,
+            "job_id": job_id,
+            "progress_url": f"/progress/{job_id}"
+        }, 202
+    
+    # Generate portfolio
+    result = generate_portfolio(
+        portfolio_data,
+        output_dir=str(output_dir_resolved),
+        site_template=site_template,
+        design_theme=design_theme
+    )
+    
+    response = _register_portfolio(
+        result, user_id, site_template, design_theme, callback_url, now
+    )
+    
+    _send_callback(callback_url, response)
+    
+    return response, 201
+
+
 @app.route("/api/generate", methods=["POST"])
 def api_generate_portfolio():
     """
@@ -74,7 +553,8 @@ def api_generate_portfolio():
         "education": [...],
         "site_template": "hybrid",  # Optional: portfolio, cv, hybrid
         "design_theme": "classic",  # Optional: classic, modern, contrast, artistic
-        "callback_url": "https://jobsmatch.com/api/portfolio-created"  # Optional
+        "callback_url": "https://jobsmatch.com/api/portfolio-created",  # Optional
+        "async": false  # Optional: generate in the background and return 202
     }
     
     Response:
@@ -86,6 +566,13 @@ def api_generate_portfolio():
         "admin_url": "/portfolios/abc-123/admin/",
         "data_url": "/api/portfolio/abc-123"
     }
+    
+    Response when "async" is true (202 Accepted):
+    {
+        "success": true,
+        "job_id": "job-123",
+        "progress_url": "/progress/job-123"
+    }
     """
     try:
         data = request.get_json(silent=True)
@@ -93,80 +580,58 @@ def api_generate_portfolio():
         if data is None:
             return jsonify({"error": "No JSON data provided"}), 400
         
-        # Extract configuration
-        user_id = data.get("user_id", "")
-        site_template = data.get("site_template", "hybrid")
-        design_theme = data.get("design_theme", "classic")
-        callback_url = data.get("callback_url")
-        
-        # Remove config fields from portfolio data
-        portfolio_data = {k: v for k, v in data.items() 
-                         if k not in ["site_template", "design_theme", "callback_url"]}
-        
-        # Sanitize user_id and build safe output directory
-        portfolios_root = PORTFOLIOS_DIR.resolve()
-        timestamp_suffix = datetime.now().strftime('%Y%m%d-%H%M%S')
-        
-        if user_id:
-            # Allow only safe characters in user_id to avoid path traversal
-            safe_user_id = "".join(c for c in user_id if c.isalnum() or c in ("-", "_"))
-            if not safe_user_id:
-                dir_name = f"portfolio-{timestamp_suffix}"
-            else:
-                dir_name = safe_user_id
-        else:
-            dir_name = f"portfolio-{timestamp_suffix}"
-        
-        candidate_output_dir = portfolios_root / dir_name
-        output_dir_resolved = candidate_output_dir.resolve()
-        
-        # Ensure the resolved output directory is under the configured portfolios root
-        try:
-            output_dir_resolved.relative_to(portfolios_root)
-        except ValueError:
-            return jsonify({"error": "Invalid user_id or output directory"}), 400
-        
-        # Generate portfolio
-        result = generate_portfolio(
-            portfolio_data,
-            output_dir=str(output_dir_resolved),
-            site_template=site_template,
-            design_theme=design_theme
-        )
-        
-        portfolio_id = result["portfolio_id"]
-        
-        # Register portfolio
-        PORTFOLIO_REGISTRY[portfolio_id] = {
-            "portfolio_id": portfolio_id,
-            "user_id": user_id,
-            "path": result["path"],
-            "site_template": site_template,
-            "design_theme": design_theme,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "callback_url": callback_url
-        }
-        
-        # Build response
-        response = {
-            "success": True,
-            "portfolio_id": portfolio_id,
-            "portfolio_url": f"/portfolios/{Path(result['path']).name}/index.html",
-            "editor_url": f"/editor/{portfolio_id}",
-            "admin_url": f"/portfolios/{Path(result['path']).name}/admin/",
-            "data_url": f"/api/portfolio/{portfolio_id}",
-            "site_template": site_template,
-            "design_theme": design_theme
-        }
-        
-        # TODO: Send callback if callback_url provided
-        
-        return jsonify(response), 201
+        body, status = _generate_portfolio(data)
+        return jsonify(body), status
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/progress/<job_id>", methods=["GET"])
+def stream_progress(job_id):
+    """
+    Stream background generation progress as Server-Sent Events.
+    
+    Each event carries a JSON object:
+        {"type": "progress", "stage": "rendering", "pct": 40}
+        {"type": "done", "portfolio_id": "abc-123", ...}  # Same body as /api/generate
+        {"type": "error", "error": "..."}
+    """
+    _expire_jobs()
+    job_queue = JOB_QUEUES.get(job_id)
+    if job_queue is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    # Events are yielded as bytes so orjson output goes out without a decode/encode round trip
+    def events() -> Iterator[bytes]:
+        waited = 0
+        try:
+            while True:
+                try:
+                    message = job_queue.get(timeout=PROGRESS_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    waited += PROGRESS_HEARTBEAT_INTERVAL
+                    if waited >= PROGRESS_TIMEOUT:
+                        yield b"data: " + orjson.dumps({"type": "error", "error": "Progress timeout"}) + b"\n\n"
+                        return
+                    yield b": heartbeat\n\n"
+                    continue
+                waited = 0
+                yield b"data: " + orjson.dumps(message) + b"\n\n"
+                if message["type"] in ("done", "error"):
+                    return
+        finally:
+            # Terminal event, timeout or client disconnect (GeneratorExit)
+            JOB_QUEUES.pop(job_id, None)
+            JOB_EXPIRES.pop(job_id, None)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/generate-astro", methods=["POST"])
 def api_generate_astro_portfolio():
     """
@@ -198,29 +663,27 @@ def api_generate_astro_portfolio():
         if data is None:
             return jsonify({"error": "No JSON data provided"}), 400
         
-        # Extract configuration
-        user_id = data.get("user_id", "")
-        site_template = data.get("site_template", "hybrid")
-        design_theme = data.get("design_theme", "classic")
-        callback_url = data.get("callback_url")
+        # Extract and validate configuration
+        try:
+            options = msgspec.convert(data, GenerateOptions)
+        except msgspec.ValidationError as e:
+            return jsonify({"error": f"Invalid request: {e}"}), 400
+        user_id = options.user_id or ""
+        site_template = options.site_template
+        design_theme = options.design_theme
+        callback_url = options.callback_url
         
         # Remove config fields from portfolio data
-        portfolio_data = {k: v for k, v in data.items() 
-                         if k not in ["site_template", "design_theme", "callback_url"]}
+        portfolio_data = {k: v for k, v in data.items() if k not in GENERATE_CONTROL_FIELDS}
         
         # Sanitize user_id and build safe output directory with Astro suffix
         portfolios_root = PORTFOLIOS_DIR.resolve()
-        timestamp_suffix = datetime.now().strftime('%Y%m%d-%H%M%S')
-        
-        if user_id:
-            # Allow only safe characters in user_id to avoid path traversal
-            safe_user_id = "".join(c for c in user_id if c.isalnum() or c in ("-", "_"))
-            if not safe_user_id:
-                dir_name = f"astro-{timestamp_suffix}"
-            else:
-                dir_name = f"{safe_user_id}-astro"
-        else:
-            dir_name = f"astro-{timestamp_suffix}"
+        # One clock read serves both the directory suffix and created_at
+        now = datetime.now(timezone.utc)
+        
+        # Allow only safe characters in user_id to avoid path traversal
+        safe_user_id = safe_dir_name(user_id)
+        dir_name = f"{safe_user_id}-astro" if safe_user_id else f"astro-{now.strftime('%Y%m%d-%H%M%S')}"
         
         candidate_output_dir = portfolios_root / dir_name
         output_dir_resolved = candidate_output_dir.resolve()
@@ -249,7 +712,7 @@ def api_generate_astro_portfolio():
             "type": "astro",
             "site_template": site_template,
             "design_theme": design_theme,
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": now.isoformat(),
             "callback_url": callback_url
         }
         
@@ -265,17 +728,32 @@ def api_generate_astro_portfolio():
             "status": result["status"]
         }
         
+        _send_callback(callback_url, response)
+        
         return jsonify(response), 201
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _with_validators(response: Response, etag: str, mtime: float) -> Response:
+    """Attach caching validators so clients can poll with conditional GETs."""
+    response.set_etag(etag, weak=True)
+    response.last_modified = datetime.fromtimestamp(int(mtime), timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.must_revalidate = True
+    return response
+
+
 @app.route("/api/portfolio/<portfolio_id>", methods=["GET"])
 def api_get_portfolio(portfolio_id):
     """
     Get portfolio data by ID.
     
+    Supports conditional requests: send back the ETag (If-None-Match) or
+    Last-Modified (If-Modified-Since) value to get 304 Not Modified when
+    the data has not changed.
+    
     Response:
     {
         "portfolio_id": "abc-123",
@@ -284,10 +762,10 @@ def api_get_portfolio(portfolio_id):
     }
     """
     try:
-        if portfolio_id not in PORTFOLIO_REGISTRY:
+        registry_entry = PORTFOLIO_REGISTRY.get(portfolio_id)
+        if registry_entry is None:
             return jsonify({"error": "Portfolio not found"}), 404
         
-        registry_entry = PORTFOLIO_REGISTRY[portfolio_id]
         portfolio_path = Path(registry_entry["path"])
         
         # Read portfolio data from correct location based on type
@@ -299,76 +777,173 @@ def api_get_portfolio(portfolio_id):
             # Default location for non-Astro portfolios
             data_file = portfolio_path / "data" / "portfolio.json"
         
-        if not data_file.exists():
+        metadata = {
+            "user_id": registry_entry["user_id"],
+            "site_template": registry_entry["site_template"],
+            "design_theme": registry_entry["design_theme"],
+            "created_at": registry_entry["created_at"],
+            "portfolio_url": f"/portfolios/{portfolio_path.name}/index.html"
+        }
+        
+        # An update still waiting for the background writer wins over the file
+        pending_data = PORTFOLIO_WRITER.pending(data_file)
+        if pending_data is not None:
+            return jsonify({"portfolio_id": portfolio_id, "data": pending_data, "metadata": metadata})
+        
+        try:
+            data_stat = data_file.stat()
+        except FileNotFoundError:
             return jsonify({"error": "Portfolio data file not found"}), 404
         
-        with open(data_file, "r", encoding="utf-8") as f:
-            portfolio_data = json.load(f)
+        # Validators derived from the data file: unchanged documents are
+        # answered with 304 before reading or encoding anything
+        etag = f"{data_stat.st_mtime_ns:x}-{data_stat.st_size:x}"
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = (
+                request.if_modified_since is not None
+                and int(data_stat.st_mtime) <= request.if_modified_since.timestamp()
+            )
+        if not_modified:
+            return _with_validators(Response(status=304), etag, data_stat.st_mtime)
         
-        return jsonify({
-            "portfolio_id": portfolio_id,
-            "data": portfolio_data,
-            "metadata": {
-                "user_id": registry_entry["user_id"],
-                "site_template": registry_entry["site_template"],
-                "design_theme": registry_entry["design_theme"],
-                "created_at": registry_entry["created_at"],
-                "portfolio_url": f"/portfolios/{portfolio_path.name}/index.html"
-            }
-        })
+        data_bytes = _read_portfolio_cached(str(data_file), data_stat.st_mtime_ns, data_stat.st_size)
+        
+        # The data file is already JSON: splice its bytes into the envelope
+        # instead of decoding and re-encoding the whole document
+        envelope = orjson.dumps({"portfolio_id": portfolio_id, "metadata": metadata})
+        body = b"".join((envelope[:-1], b',"data":', data_bytes, b"}"))
+        
+        return _with_validators(app.response_class(body, mimetype="application/json"), etag, data_stat.st_mtime)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/portfolio/<portfolio_id>", methods=["PUT"])
-def api_update_portfolio(portfolio_id):
+# Request-only flags of PUT /api/portfolio/<id>, never persisted to portfolio.json
+UPDATE_CONTROL_FIELDS = frozenset(UpdateOptions.__struct_fields__)
+
+# Regeneration after an update is debounced per portfolio: a burst of PUTs
+# (e.g. editor autosave) collapses into one generate_portfolio call once the
+# portfolio has been quiet for REGEN_DEBOUNCE_SECONDS. 0 regenerates inline.
+REGEN_DEBOUNCE_SECONDS = float(os.getenv("REGEN_DEBOUNCE_SECONDS", "0.75"))
+REGEN_TIMERS: Dict[str, threading.Timer] = {}
+REGEN_LOCK = threading.Lock()
+
+
+def _do_regenerate(portfolio_id: str, registry_entry: Dict[str, Any], portfolio_data: Dict[str, Any]) -> None:
+    """Render a portfolio from its latest pending data."""
+    try:
+        # Persist the merged data first: generate_portfolio overwrites it
+        PORTFOLIO_WRITER.flush(Path(registry_entry["path"]) / "data" / "portfolio.json")
+        generate_portfolio(
+            portfolio_data,
+            output_dir=registry_entry["path"],
+            site_template=registry_entry["site_template"],
+            design_theme=registry_entry["design_theme"]
+        )
+    except Exception as error:
+        app.logger.error("Regeneration of portfolio %s failed: %s", portfolio_id, error)
+    finally:
+        # Registered until the render is done: an update arriving meanwhile
+        # schedules a fresh regeneration rather than being overwritten by this one
+        with REGEN_LOCK:
+            if REGEN_TIMERS.get(portfolio_id) is threading.current_thread():
+                del REGEN_TIMERS[portfolio_id]
+
+
+def _regenerate(portfolio_id: str, registry_entry: Dict[str, Any], portfolio_data: Dict[str, Any]) -> bool:
     """
-    Update an existing portfolio.
+    Regenerate a portfolio, debounced when REGEN_DEBOUNCE_SECONDS > 0.
     
-    Request body:
-    {
-        "basics": {...},
-        "projects": [...],
-        ...
-        "regenerate": true  # Optional: regenerate HTML (default: true)
-    }
+    Returns True when regeneration was scheduled rather than run inline.
+    """
+    if REGEN_DEBOUNCE_SECONDS <= 0:
+        PORTFOLIO_WRITER.flush(Path(registry_entry["path"]) / "data" / "portfolio.json")
+        generate_portfolio(
+            portfolio_data,
+            output_dir=registry_entry["path"],
+            site_template=registry_entry["site_template"],
+            design_theme=registry_entry["design_theme"]
+        )
+        return False
     
-    Response:
-    {
-        "success": true,
-        "portfolio_id": "abc-123",
-        "updated_at": "2026-02-17T15:30:00Z"
-    }
+    timer = threading.Timer(REGEN_DEBOUNCE_SECONDS, _do_regenerate, args=(portfolio_id, registry_entry, portfolio_data))
+    with REGEN_LOCK:
+        previous = REGEN_TIMERS.pop(portfolio_id, None)
+        if previous is not None:
+            previous.cancel()
+        REGEN_TIMERS[portfolio_id] = timer
+        timer.start()
+    return True
+
+
+def _update_portfolio(
+    portfolio_id: str, registry_entry: Dict[str, Any], data: Dict[str, Any]
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Apply an update to a registered portfolio and return (response body, status).
+    
+    By default ``data`` is merged into the stored portfolio.json. With
+    ``"full_replace": true`` it is taken as the complete portfolio document:
+    the stored file is not read, and when regenerating, ``data`` is handed
+    to generate_portfolio with the project ids of the document queued in
+    the meantime. Either way portfolio.json is updated
+    right away (through the background writer), so reads and merges that
+    arrive before a debounced regeneration see the new document.
     """
     try:
-        if portfolio_id not in PORTFOLIO_REGISTRY:
-            return jsonify({"error": "Portfolio not found"}), 404
-        
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
-        
-        registry_entry = PORTFOLIO_REGISTRY[portfolio_id]
-        portfolio_path = Path(registry_entry["path"])
-        
-        # Update portfolio data file
-        data_file = portfolio_path / "data" / "portfolio.json"
-        
-        # Read current data
-        with open(data_file, "r", encoding="utf-8") as f:
-            current_data = json.load(f)
+        options = msgspec.convert(data, UpdateOptions)
+    except msgspec.ValidationError as e:
+        return {"error": f"Invalid request: {e}"}, 400
+    
+    portfolio_path = Path(registry_entry["path"])
+    data_file = portfolio_path / "data" / "portfolio.json"
+    # A regeneration already scheduled would render an older document over
+    # this update: reschedule it with the new data instead
+    with REGEN_LOCK:
+        regenerate = options.regenerate or portfolio_id in REGEN_TIMERS
+    regenerate_scheduled = False
+    updates = {k: v for k, v in data.items() if k not in UPDATE_CONTROL_FIELDS}
+    
+    if options.full_replace:
+        if regenerate:
+            # Queue the document as generate_portfolio will write it, so it is
+            # visible before the (debounced) render rewrites portfolio.json.
+            # The render is handed the project ids drawn here, so ids read in
+            # between stay valid afterwards.
+            site_template = registry_entry["site_template"]
+            payload = normalize_input_payload(updates, site_template=site_template)
+            site_data = build_site_data(payload, site_template)
+            payload = {
+                **payload,
+                "projects": [
+                    {**project, "project_id": built["project_id"]}
+                    for project, built in zip(payload.get("projects") or [], site_data["projects"])
+                ],
+            }
+            PORTFOLIO_WRITER.submit(data_file, site_data)
+            regenerate_scheduled = _regenerate(portfolio_id, registry_entry, payload)
+        else:
+            PORTFOLIO_WRITER.submit(data_file, updates)
+    else:
+        # Read current data, including an update not yet written to disk
+        pending_data = PORTFOLIO_WRITER.pending(data_file)
+        current_data = dict(pending_data) if pending_data is not None else orjson.loads(data_file.read_bytes())
         
         # Merge with new data (preserve project_ids)
-        current_data.update(data)
+        current_data.update(updates)
         
-        # Write updated data
-        with open(data_file, "w", encoding="utf-8") as f:
-            json.dump(current_data, f, ensure_ascii=False, indent=2)
+        # Write updated data (coalesced by the background writer)
+        PORTFOLIO_WRITER.submit(data_file, current_data)
         
         # Regenerate HTML if requested
-        regenerate = data.get("regenerate", True)
         if regenerate:
+            # Email is the first "email | phone" field of contact_line, if any
+            email_part, separator, _ = current_data.get("contact_line", "").partition("|")
+            email = email_part.strip() if separator else None
+            
             # Rebuild portfolio data in the correct format
             portfolio_data = {
                 "basics": {
@@ -376,7 +951,7 @@ def api_update_portfolio(portfolio_id):
                     "summary": current_data.get("bio", ""),
                     "label": current_data.get("headline"),
                     "image": current_data.get("photo_url"),
-                    "email": current_data.get("contact_line", "").split("|")[0].strip() if "|" in current_data.get("contact_line", "") else None,
+                    "email": email,
                     "profiles": current_data.get("profiles", [])
                 },
                 "skills": current_data.get("skills", []),
@@ -385,20 +960,67 @@ def api_update_portfolio(portfolio_id):
             }
             
             # Regenerate
-            generate_portfolio(
-                portfolio_data,
-                output_dir=str(portfolio_path),
-                site_template=registry_entry["site_template"],
-                design_theme=registry_entry["design_theme"]
-            )
-        
-        updated_at = datetime.now(timezone.utc).isoformat()
-        
-        return jsonify({
+            regenerate_scheduled = _regenerate(portfolio_id, registry_entry, portfolio_data)
+    
+    if options.sync:
+        PORTFOLIO_WRITER.flush(data_file)
+    # Written only when this request waited for the disk: an explicit sync, or
+    # an inline regeneration, which flushes the writer before rendering
+    persisted = "written" if options.sync or (regenerate and not regenerate_scheduled) else "pending"
+    
+    updated_at = datetime.now(timezone.utc).isoformat()
+    
+    if regenerate_scheduled:
+        return {
             "success": True,
             "portfolio_id": portfolio_id,
-            "updated_at": updated_at
-        })
+            "updated_at": updated_at,
+            "persisted": persisted,
+            "regenerate_scheduled": True
+        }, 202
+    return {
+        "success": True,
+        "portfolio_id": portfolio_id,
+        "updated_at": updated_at,
+        "persisted": persisted
+    }, 200
+
+
+@app.route("/api/portfolio/<portfolio_id>", methods=["PUT"])
+def api_update_portfolio(portfolio_id):
+    """
+    Update an existing portfolio.
+    
+    Request body:
+    {
+        "basics": {...},
+        "projects": [...],
+        ...
+        "regenerate": true,  # Optional: regenerate HTML (default: true)
+        "full_replace": false,  # Optional: body is the complete document, skip the merge (default: false)
+        "sync": false  # Optional: wait until portfolio.json is written (default: false)
+    }
+    
+    Response (202 Accepted with "regenerate_scheduled": true when the
+    regeneration is debounced):
+    {
+        "success": true,
+        "portfolio_id": "abc-123",
+        "updated_at": "2026-02-17T15:30:00Z",
+        "persisted": "pending"  # "written" when the request waited for the disk (sync or inline regeneration)
+    }
+    """
+    try:
+        registry_entry = PORTFOLIO_REGISTRY.get(portfolio_id)
+        if registry_entry is None:
+            return jsonify({"error": "Portfolio not found"}), 404
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No JSON data provided"}), 400
+        
+        body, status = _update_portfolio(portfolio_id, registry_entry, data)
+        return jsonify(body), status
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -417,10 +1039,10 @@ def api_validate_portfolio(portfolio_id):
     }
     """
     try:
-        if portfolio_id not in PORTFOLIO_REGISTRY:
+        registry_entry = PORTFOLIO_REGISTRY.get(portfolio_id)
+        if registry_entry is None:
             return jsonify({"error": "Portfolio not found"}), 404
         
-        registry_entry = PORTFOLIO_REGISTRY[portfolio_id]
         result = mark_site_validated(registry_entry["path"])
         
         return jsonify({
@@ -439,20 +1061,44 @@ def serve_editor(portfolio_id=None):
     """
     Serve the manual editor HTML.
     If portfolio_id is provided, pre-fill the editor with existing data.
-    """
-    editor_path = Path(__file__).parent / "manual_editor.html"
     
-    if not editor_path.exists():
+    The page is served from memory (loaded at startup) with an ETag, so
+    repeat visits are answered with 304 Not Modified.
+    """
+    if EDITOR_BYTES is None:
         return jsonify({"error": "Editor not found"}), 404
     
-    # If portfolio_id provided, we'll need to modify the editor to support pre-filling
-    # For now, just serve the editor
-    return send_file(str(editor_path))
+    if request.if_none_match.contains(EDITOR_ETAG):
+        response = Response(status=304)
+    else:
+        # If portfolio_id provided, we'll need to modify the editor to support pre-filling
+        # For now, just serve the editor
+        response = Response(EDITOR_BYTES, mimetype="text/html")
+    response.set_etag(EDITOR_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = EDITOR_MAX_AGE
+    return response
 
 
 @app.route("/portfolios/<path:filename>")
 def serve_portfolio(filename):
-    """Serve generated portfolio files."""
+    """
+    Serve generated portfolio files.
+    
+    In production, prefer letting the web server serve PORTFOLIOS_DIR
+    directly; otherwise set X_ACCEL_REDIRECT_PREFIX (nginx) or
+    USE_X_SENDFILE so that only the lookup goes through Python.
+    """
+    if X_ACCEL_REDIRECT_PREFIX:
+        file_path = safe_join(str(PORTFOLIOS_DIR), filename)
+        if file_path is None or not os.path.isfile(file_path):
+            return jsonify({"error": "File not found"}), 404
+        response = Response(status=200)
+        # nginx decodes the redirect URI: spaces, %, ?, # and non-ASCII must be escaped
+        response.headers["X-Accel-Redirect"] = f"{X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(filename)}"
+        # Let nginx pick the Content-Type from the file extension
+        del response.headers["Content-Type"]
+        return response
     return send_from_directory(str(PORTFOLIOS_DIR), filename)
 
 
@@ -489,14 +1135,21 @@ def api_editor_save():
             return jsonify({"error": "No JSON data provided"}), 400
         
         portfolio_id = request_data.get("portfolio_id")
+        registry_entry = PORTFOLIO_REGISTRY.get(portfolio_id) if portfolio_id else None
         
-        if portfolio_id and portfolio_id in PORTFOLIO_REGISTRY:
-            # Update existing portfolio
-            response = api_update_portfolio(portfolio_id)
-            return response
+        if registry_entry is not None:
+            # Update existing portfolio: the editor always sends the complete document
+            body, status = _update_portfolio(
+                portfolio_id, registry_entry, {**(request_data.get("data") or {}), "full_replace": True}
+            )
+            return jsonify(body), status
         else:
-            # Generate new portfolio
-            return api_generate_portfolio()
+            # Generate new portfolio from the editor's document
+            body, status = _generate_portfolio({
+                **(request_data.get("data") or {}),
+                **{k: request_data[k] for k in ("user_id", "site_template", "design_theme") if k in request_data},
+            })
+            return jsonify(body), status
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -517,6 +1170,7 @@ def index():
             "GET /editor": "Serve manual editor",
             "GET /editor/<id>": "Serve editor with pre-filled data",
             "POST /api/editor/save": "Save data from remote editor",
+            "GET /progress/<job_id>": "Stream background generation progress (SSE)",
             "GET /portfolios/<path>": "Serve generated portfolio files",
             "GET /health": "Health check"
         },
@@ -540,4 +1194,15 @@ if __name__ == "__main__":
     print(f"🎨 Editor: http://localhost:{port}/editor")
     print(f"💾 Portfolios directory: {PORTFOLIOS_DIR.absolute()}")
     
-    app.run(host="0.0.0.0", port=port, debug=debug)
+    if debug or os.getenv("USE_GUNICORN", "true").lower() != "true":
+        # Flask development server (auto-reload, debugger)
+        app.run(host="0.0.0.0", port=port, debug=debug)
+    else:
+        # Production server: gunicorn with a gevent worker, see gunicorn.conf.py
+        app_dir = str(Path(__file__).resolve().parent)
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [app_dir, os.getenv("PYTHONPATH")]))}
+        os.execve(sys.executable, [
+            sys.executable, "-m", "gunicorn",
+            "--config", str(Path(app_dir) / "gunicorn.conf.py"),
+            "api_server:app",
+        ], env)
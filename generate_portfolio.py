@@ -1,26 +1,33 @@
-import argparse
 from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import html
 import json
+import os
 import re
-import shutil
-from uuid import uuid4
+from uuid import UUID
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # The CLI keeps working with only the standard library
+    orjson = None
+
+if TYPE_CHECKING:
+    import argparse
 
 
 DEFAULT_PROJECT_IMAGE = "https://via.placeholder.com/400x250/0077b6/FFFFFF?text=Project"
 DEFAULT_PROFILE_PHOTO = "https://via.placeholder.com/240x240/2c3e50/FFFFFF?text=Profile"
+# Escaped once at import: projects without an image skip the sanitizer entirely
+DEFAULT_PROJECT_IMAGE_ESCAPED = html.escape(DEFAULT_PROJECT_IMAGE, quote=True)
 DEFAULT_TEMPLATE_MODE = "hybrid"
 DEFAULT_DESIGN_THEME = "classic"
 TEMPLATE_MODES = {"portfolio", "cv", "hybrid"}
 DESIGN_THEME_FILES = {"classic": "main.css", "modern": "modern.css", "contrast": "contrast.css", "artistic": "artistic.css"}
+SQL_PROJECTION_FORMATS = {"json", "msgpack"}
 SECTION_TITLE_BY_TEMPLATE = {"portfolio": "Réalisations", "cv": "Expériences", "hybrid": "Réalisations & Expériences"}
-PROJECT_CARD_TEMPLATE = """                <div class="project-card">
-                    <img src="{image}" alt="{title}">
-                    <h3>{title}</h3>
-                    <p>{description}</p>
-                </div>"""
 
 DECAP_ADMIN_INDEX = """<!doctype html>
 <html>
@@ -64,58 +71,225 @@ NETLIFY_TOML = """[build]
   publish = "."
 """
 
+ASTRO_GITIGNORE = """node_modules/
+dist/
+.astro/
+"""
 
-def _sanitize_text(value: Any) -> str:
-    return html.escape(str(value or ""), quote=True)
+DECAP_ADMIN_INDEX_BYTES = DECAP_ADMIN_INDEX.encode("utf-8")
+DECAP_CONFIG_YML_BYTES = DECAP_CONFIG_YML.encode("utf-8")
+NETLIFY_TOML_BYTES = NETLIFY_TOML.encode("utf-8")
+ASTRO_GITIGNORE_BYTES = ASTRO_GITIGNORE.encode("utf-8")
 
 
-def _normalize_projects(projects: Any) -> List[Dict[str, str]]:
-    normalized: List[Dict[str, str]] = []
-    for project in projects or []:
-        normalized.append(
-            {
-                "title": _sanitize_text(project.get("title")),
-                "description": _sanitize_text(project.get("description")),
-                "image": _sanitize_text(project.get("image") or DEFAULT_PROJECT_IMAGE),
-            }
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+HTML_TEMPLATE_PATH = TEMPLATES_DIR / "index.html"
+PROJECT_LOOP_RE = re.compile(r"\s*\{%\s*for project in projects\s*%\}.*?\{%\s*endfor\s*%\}", re.DOTALL)
+PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+WORKFLOW_STATUS_RE = re.compile(rb'"status"\s*:\s*"[^"\\]*"')
+WORKFLOW_VALIDATED_AT_RE = re.compile(rb'"validated_at"\s*:\s*"[^"\\]*"')
+
+
+@lru_cache(maxsize=8)
+def _load_template(path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Read a template once per modification; every later render reuses it.
+
+    The template is split once into alternating literal text and placeholder
+    names (the project loop block becomes a ``projects_block`` placeholder), so
+    a render only joins segments and never scans the template again.
+    """
+    template, replaced = PROJECT_LOOP_RE.subn("\n{{projects_block}}", Path(path).read_text(encoding="utf-8"))
+    if replaced != 1:
+        raise ValueError(
+            "Template project loop block ({% for project in projects %}...{% endfor %}) not found or appears multiple times in template"
         )
-    return normalized
+    # split() alternates literal text and captured placeholder names
+    return tuple(PLACEHOLDER_RE.split(template))
+
+
+def _render_template(segments: Tuple[str, ...], values: Dict[str, str]) -> str:
+    parts = [segments[0]]
+    append = parts.append
+    for index in range(1, len(segments), 2):
+        append(values[segments[index]])
+        append(segments[index + 1])
+    return "".join(parts)
+
+
+@lru_cache(maxsize=32)
+def _load_asset(path: str, mtime_ns: int) -> bytes:
+    return Path(path).read_bytes()
+
+
+def _asset_bytes(path: Path) -> bytes:
+    # Static template assets are read once per modification, like the HTML template
+    return _load_asset(str(path), path.stat().st_mtime_ns)
+
+
+def _html_template() -> Tuple[str, ...]:
+    # Keyed on mtime so edits to the template are picked up without a restart
+    return _load_template(str(HTML_TEMPLATE_PATH), HTML_TEMPLATE_PATH.stat().st_mtime_ns)
+
+
+def _theme_stylesheet(design_theme: str) -> bytes:
+    return _asset_bytes(TEMPLATES_DIR / "styles" / DESIGN_THEME_FILES[design_theme])
+
+
+def warm_template_cache() -> None:
+    """Load the HTML template ahead of the first generation (e.g. at server start)."""
+    _html_template()
+    for design_theme in DESIGN_THEME_FILES:
+        _theme_stylesheet(design_theme)
+
+
+if orjson is not None:
+    def _dump_json(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    _load_json = orjson.loads
+else:
+    def _dump_json(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+
+    _load_json = json.loads
+
+
+def _make_dirs(root: str, sub_dirs: Iterable[str]) -> None:
+    """Create ``root`` (with parents) and then each sub directory, parents listed first.
+
+    Only the root needs the ancestor walk of makedirs; the rest are one mkdir each.
+    """
+    os.makedirs(root, exist_ok=True)
+    for directory in sub_dirs:
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            if not os.path.isdir(directory):
+                raise
+
+
+def _write_files(writes: Iterable[Tuple[str, bytes]]) -> None:
+    """Write pre-encoded payloads straight to file descriptors, skipping the text IO stack.
+
+    Each payload goes to a sibling temp file that is then renamed over the target, so a
+    concurrent reader (the API serving portfolio.json during a regeneration) sees either
+    the previous file or the new one, never a truncated one.
+    """
+    for path, payload in writes:
+        directory, name = os.path.split(path)
+        temp_path = os.path.join(directory, f".{name}.{os.urandom(6).hex()}.tmp")
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            try:
+                view = memoryview(payload)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
 
+def _zip_files(writes: Iterable[Tuple[str, bytes]]) -> bytes:
+    """Pack pre-encoded payloads into an in-memory zip, keyed by their relative paths."""
+    import io
+    import zipfile
 
+    buffer = io.BytesIO()
+    # Stored, not deflated: the site is a handful of small files and the
+    # deploy upload is compressed in transit anyway
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for path, payload in writes:
+            archive.writestr(path.replace(os.sep, "/"), payload)
+    return buffer.getvalue()
+
+
+def _uuid4_batch(count: int) -> List[str]:
+    """Return ``count`` random UUID4 strings drawn from a single os.urandom call."""
+    raw = os.urandom(16 * count)
+    return [str(UUID(bytes=raw[offset:offset + 16], version=4)) for offset in range(0, 16 * count, 16)]
+
+
+def safe_dir_name(user_id: str) -> str:
+    """Keep only ``[A-Za-z0-9_-]`` so a user id can be used as a directory name."""
+    return "".join(c for c in user_id if c.isalnum() or c in ("-", "_"))
+
+
+# Longer strings are free text (bios, descriptions) that rarely repeat: caching
+# them would only pin user data in a long-running API process
+ESCAPE_CACHE_MAX_LENGTH = 256
+
+
+def _sanitize_text(value: Any) -> str:
+    if value is None:
+        return ""
+    text = value if type(value) is str else str(value)
+    if len(text) <= ESCAPE_CACHE_MAX_LENGTH:
+        return _escape_text_cached(text)
+    return _escape_text(text)
+
+
+def _escape_text(text: str) -> str:
+    # Most names and bios contain no HTML specials: a few substring scans are
+    # much cheaper than escaping (and faster than a regex search on long text)
+    if "&" in text or "<" in text or ">" in text or '"' in text or "'" in text:
+        # html.escape's chained C-level replaces beat str.translate with a dict
+        # table, which does a Python mapping lookup per character
+        return html.escape(text, quote=True)
+    return text
+
+
+# Skill names, job titles and default image URLs recur across portfolios (and
+# across the many sites a generate_many worker renders), so short strings are memoized
+_escape_text_cached = lru_cache(maxsize=4096)(_escape_text)
+
+
+# The normalizers below run once per input item; they bind the sanitizer and
+# list.append to locals so each iteration skips the global/attribute lookups.
 def _normalize_profiles(profiles: Any) -> List[Dict[str, str]]:
+    sanitize = _sanitize_text
     normalized: List[Dict[str, str]] = []
+    append = normalized.append
     for profile in profiles or []:
-        network = _sanitize_text(profile.get("network"))
-        url = _sanitize_text(profile.get("url") or profile.get("username"))
+        get = profile.get
+        network = sanitize(get("network"))
+        url = sanitize(get("url") or get("username"))
         if network or url:
-            normalized.append({"network": network or "Profil", "url": url})
+            append({"network": network or "Profil", "url": url})
     return normalized
 
 
 def _normalize_skills(skills: Any) -> List[str]:
+    sanitize = _sanitize_text
     normalized: List[str] = []
+    append = normalized.append
     for skill in skills or []:
-        name = _sanitize_text(skill.get("name"))
+        name = sanitize(skill.get("name"))
         if name:
-            normalized.append(name)
+            append(name)
         for keyword in skill.get("keywords") or []:
-            normalized.append(_sanitize_text(keyword))
-    return [value for value in normalized if value]
+            keyword = sanitize(keyword)
+            if keyword:
+                append(keyword)
+    return normalized
 
 
 def _normalize_education(education: Any) -> List[Dict[str, str]]:
+    sanitize = _sanitize_text
     normalized: List[Dict[str, str]] = []
+    append = normalized.append
     for item in education or []:
-        title = " - ".join(
-            filter(None, [_sanitize_text(item.get("studyType")), _sanitize_text(item.get("area"))])
-        )
-        period = " → ".join(filter(None, [_sanitize_text(item.get("startDate")), _sanitize_text(item.get("endDate"))]))
-        normalized.append(
+        get = item.get
+        study_type, area = sanitize(get("studyType")), sanitize(get("area"))
+        start, end = sanitize(get("startDate")), sanitize(get("endDate"))
+        append(
             {
-                "institution": _sanitize_text(item.get("institution")),
-                "title": title,
-                "period": period,
-                "score": _sanitize_text(item.get("score")),
+                "institution": sanitize(get("institution")),
+                "title": f"{study_type} - {area}" if study_type and area else study_type or area,
+                "period": f"{start} → {end}" if start and end else start or end,
+                "score": sanitize(get("score")),
             }
         )
     return normalized
@@ -127,24 +301,25 @@ def _cv_to_portfolio_payload(cv_data: Dict[str, Any], site_template: str = DEFAU
     mapped_projects: List[Dict[str, str]] = []
 
     for project in cv_data.get("projects") or []:
-        mapped_projects.append(
-            {
-                "title": project.get("name", ""),
-                "description": project.get("description", ""),
-                "image": project.get("image", ""),
-            }
-        )
+        get = project.get
+        mapped_projects.append({"title": get("name", ""), "description": get("description", ""), "image": get("image", "")})
 
     work_projects: List[Dict[str, str]] = []
     for work in cv_data.get("work") or []:
-        highlights_value = work.get("highlights")
-        highlights_list = highlights_value if isinstance(highlights_value, list) else []
-        highlights = ", ".join(str(item) for item in highlights_list)
-        description = " ".join([work.get("summary", ""), highlights]).strip()
+        get = work.get
+        highlights_value = get("highlights")
+        highlights = ", ".join([str(item) for item in highlights_value]) if isinstance(highlights_value, list) else ""
+        summary = get("summary") or ""
+        position = get("position")
+        company = get("name")
+        if position and company:
+            title = f"{position} - {company}"
+        else:
+            title = position or company or ""
         work_projects.append(
             {
-                "title": " - ".join(filter(None, [work.get("position"), work.get("name")])),
-                "description": description,
+                "title": title,
+                "description": f"{summary} {highlights}".strip() if highlights else summary.strip(),
                 "image": "",
             }
         )
@@ -166,17 +341,7 @@ def _cv_to_portfolio_payload(cv_data: Dict[str, Any], site_template: str = DEFAU
         "photo_url": basics.get("image"),
         "email": basics.get("email"),
         "phone": basics.get("phone"),
-        "address_line": " | ".join(
-            filter(
-                None,
-                [
-                    location.get("address"),
-                    " ".join(filter(None, [location.get("postalCode"), location.get("city")])),
-                    location.get("region"),
-                    location.get("countryCode"),
-                ],
-            )
-        ),
+        "address_line": _address_line(location),
         "profiles": basics.get("profiles") or [],
         "skills": cv_data.get("skills") or [],
         "education": cv_data.get("education") or [],
@@ -184,6 +349,17 @@ def _cv_to_portfolio_payload(cv_data: Dict[str, Any], site_template: str = DEFAU
     }
 
 
+def _address_line(location: Dict[str, Any]) -> str:
+    get = location.get
+    postal_code, city = get("postalCode"), get("city")
+    locality = f"{postal_code} {city}" if postal_code and city else postal_code or city
+    parts = []
+    for part in (get("address"), locality, get("region"), get("countryCode")):
+        if part:
+            parts.append(part)
+    return " | ".join(parts)
+
+
 def normalize_input_payload(user_data: Dict[str, Any], site_template: str = DEFAULT_TEMPLATE_MODE) -> Dict[str, Any]:
     """Support legacy portfolio payload and CV augmented/JSON Resume-like payload."""
     if "basics" in user_data:
@@ -193,42 +369,67 @@ def normalize_input_payload(user_data: Dict[str, Any], site_template: str = DEFA
 
 def build_portfolio_record(user_data: Dict[str, Any], site_template: str = DEFAULT_TEMPLATE_MODE) -> Dict[str, Any]:
     """Build a canonical MongoDB-friendly record with SQL-friendly identifiers."""
+    return _build_record_and_sql_projects(user_data, site_template)[0]
+
+
+def build_site_data(user_data: Dict[str, Any], site_template: str = DEFAULT_TEMPLATE_MODE) -> Dict[str, Any]:
+    """Build the public ``data/portfolio.json`` document that generate_portfolio would write."""
+    return _site_data(_build_record_and_sql_projects(user_data, site_template)[0])
+
+
+def _build_record_and_sql_projects(
+    user_data: Dict[str, Any], site_template: str
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    # Projects are sanitized and shaped for both the document and the SQL
+    # projection in a single pass over the payload
     if site_template not in TEMPLATE_MODES:
         raise ValueError(f"Unsupported site_template '{site_template}'. Expected one of: {sorted(TEMPLATE_MODES)}")
     normalized_payload = normalize_input_payload(user_data, site_template=site_template)
     now = datetime.now(timezone.utc).isoformat()
     raw_user_id = normalized_payload.get("user_id")
     user_id = _sanitize_text(raw_user_id) if raw_user_id is not None else ""
+    raw_projects = normalized_payload.get("projects") or []
+    # Identifiers: portfolio, fallback user, then one per project
+    ids = _uuid4_batch(len(raw_projects) + 2)
     if not user_id:
-        user_id = str(uuid4())
+        user_id = ids[1]
+    portfolio_id = ids[0]
+    email = _sanitize_text(normalized_payload.get("email"))
+    phone = _sanitize_text(normalized_payload.get("phone"))
     projects: List[Dict[str, Any]] = []
-    for project in _normalize_projects(normalized_payload.get("projects")):
-        projects.append(
+    sql_projects: List[Dict[str, Any]] = []
+    sanitize = _sanitize_text
+    append_project = projects.append
+    append_sql_project = sql_projects.append
+    for project_id, project in zip(ids[2:], raw_projects):
+        get = project.get
+        # A project that already has an id (re-rendering a stored document) keeps it
+        existing_id = get("project_id")
+        if existing_id:
+            project_id = sanitize(existing_id)
+        title = sanitize(get("title"))
+        description = sanitize(get("description"))
+        image = get("image")
+        image = sanitize(image) if image else DEFAULT_PROJECT_IMAGE_ESCAPED
+        append_project({"project_id": project_id, "title": title, "description": description, "image": image})
+        append_sql_project(
             {
-                "project_id": str(uuid4()),
-                "title": project["title"],
-                "description": project["description"],
-                "image": project["image"],
+                "project_id": project_id,
+                "portfolio_id": portfolio_id,
+                "title": title,
+                "description": description,
+                "image": image,
             }
         )
-    return {
-        "portfolio_id": str(uuid4()),
+    record = {
+        "portfolio_id": portfolio_id,
         "user_id": user_id,
         "name": _sanitize_text(normalized_payload.get("name")),
         "bio": _sanitize_text(normalized_payload.get("bio")),
         "headline": _sanitize_text(normalized_payload.get("headline") or "Profil professionnel"),
         "photo_url": _sanitize_text(normalized_payload.get("photo_url") or DEFAULT_PROFILE_PHOTO),
         "contact_line": (
-            " | ".join(
-                filter(
-                    None,
-                    [
-                        _sanitize_text(normalized_payload.get("email")),
-                        _sanitize_text(normalized_payload.get("phone")),
-                    ],
-                )
-            )
-            or "Contact non renseigné"
+            f"{email} | {phone}" if email and phone else email or phone or "Contact non renseigné"
         ),
         "address_line": _sanitize_text(normalized_payload.get("address_line") or "Adresse non renseignée"),
         "profiles": _normalize_profiles(normalized_payload.get("profiles")),
@@ -239,9 +440,10 @@ def build_portfolio_record(user_data: Dict[str, Any], site_template: str = DEFAU
         "updated_at": now,
         "site_template": site_template,
     }
+    return record, sql_projects
 
 
-def _build_sql_projection(record: Dict[str, Any]) -> Dict[str, Any]:
+def _build_sql_projection(record: Dict[str, Any], sql_projects: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {
         "portfolios": [
             {
@@ -253,31 +455,61 @@ def _build_sql_projection(record: Dict[str, Any]) -> Dict[str, Any]:
                 "updated_at": record["updated_at"],
             }
         ],
-        "projects": [
-            {
-                "project_id": project["project_id"],
-                "portfolio_id": record["portfolio_id"],
-                "title": project["title"],
-                "description": project["description"],
-                "image": project["image"],
-            }
-            for project in record["projects"]
-        ],
+        "projects": sql_projects,
     }
 
 
+def _site_data(record: Dict[str, Any]) -> Dict[str, Any]:
+    # Public content shared by data/portfolio.json and the Astro content collection
+    return {
+        "name": record["name"],
+        "bio": record["bio"],
+        "headline": record["headline"],
+        "photo_url": record["photo_url"],
+        "contact_line": record["contact_line"],
+        "address_line": record["address_line"],
+        "profiles": record["profiles"],
+        "skills": record["skills"],
+        "education": record["education"],
+        "projects": record["projects"],
+    }
+
+
+def _patch_workflow_state(raw: bytes, validated_at: str) -> Optional[bytes]:
+    """Set status/validated_at by patching the flat JSON object in place; None when it doesn't fit."""
+    raw = raw.rstrip()
+    if not (raw.startswith(b"{") and raw.endswith(b"}")):
+        return None
+    raw, replaced = WORKFLOW_STATUS_RE.subn(b'"status": "validated"', raw, count=1)
+    if not replaced:
+        return None
+    timestamp = validated_at.encode("ascii")
+    raw, replaced = WORKFLOW_VALIDATED_AT_RE.subn(b'"validated_at": "' + timestamp + b'"', raw, count=1)
+    if not replaced:
+        raw = raw[:-1].rstrip() + b',\n  "validated_at": "' + timestamp + b'"\n}'
+    return raw
+
+
 def mark_site_validated(output_dir: str) -> Dict[str, str]:
     output_path = Path(output_dir).resolve()
     workflow_state_path = output_path / "data" / "workflow_state.json"
+    validated_at = datetime.now(timezone.utc).isoformat()
     try:
-        state = json.loads(workflow_state_path.read_text(encoding="utf-8"))
-    except (FileNotFoundError, json.JSONDecodeError) as error:
+        raw = workflow_state_path.read_bytes()
+        # workflow_state.json is a small flat object written by generate_portfolio:
+        # patch the two fields directly and only fall back to a full decode/encode
+        # when the bytes don't look like that
+        patched = _patch_workflow_state(raw, validated_at)
+        if patched is None:
+            state = _load_json(raw)
+            state["status"] = "validated"
+            state["validated_at"] = validated_at
+            patched = _dump_json(state)
+    except (FileNotFoundError, json.JSONDecodeError) as error:  # orjson.JSONDecodeError subclasses it
         raise ValueError(
             f"Cannot validate site at '{output_path}': missing or invalid data/workflow_state.json. Generate a draft first."
         ) from error
-    state["status"] = "validated"
-    state["validated_at"] = datetime.now(timezone.utc).isoformat()
-    workflow_state_path.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_files(((str(workflow_state_path), patched),))
     return {"path": str(output_path), "status": "validated"}
 
 
@@ -287,27 +519,43 @@ def generate_portfolio(
     mongo_collection: Any = None,
     site_template: str = DEFAULT_TEMPLATE_MODE,
     design_theme: str = DEFAULT_DESIGN_THEME,
-) -> Dict[str, str]:
-    """Generate a static portfolio that can be deployed directly on Netlify."""
+    progress: Optional[Callable[[str, int], None]] = None,
+    emit_sql_projection: bool = False,
+    sql_format: str = "json",
+    as_archive: bool = False,
+) -> Dict[str, Any]:
+    """Generate a static portfolio that can be deployed directly on Netlify.
+
+    ``progress``, when given, is called as ``progress(stage, percent)`` at each generation step.
+    The SQL-friendly projection is only written when ``emit_sql_projection`` is set, as
+    ``data/portfolio_sql_projection.json`` or, with ``sql_format="msgpack"``, ``.msgpack``.
+    With ``as_archive``, nothing is written to ``output_dir``: the site is returned as zip
+    bytes under ``"archive"``, ready for Netlify's zip deploy API.
+    """
     if site_template not in TEMPLATE_MODES:
         raise ValueError(f"Unsupported site_template '{site_template}'. Expected one of: {sorted(TEMPLATE_MODES)}")
     if design_theme not in DESIGN_THEME_FILES:
         raise ValueError(f"Unsupported design_theme '{design_theme}'. Expected one of: {sorted(DESIGN_THEME_FILES)}")
-    base_dir = Path(__file__).resolve().parent
-    template_path = base_dir / "templates" / "index.html"
-    css_path = base_dir / "templates" / "styles" / DESIGN_THEME_FILES[design_theme]
-    output_path = Path(output_dir).resolve()
-
-    record = build_portfolio_record(user_data, site_template=site_template)
+    if sql_format not in SQL_PROJECTION_FORMATS:
+        raise ValueError(f"Unsupported sql_format '{sql_format}'. Expected one of: {sorted(SQL_PROJECTION_FORMATS)}")
+    # abspath is pure string work; resolve() would lstat every path component.
+    # Archive entries are joined onto an empty root, which keeps them relative
+    root = "" if as_archive else os.path.abspath(output_dir)
+
+    if progress is not None:
+        progress("building_record", 10)
+    record, sql_projects = _build_record_and_sql_projects(user_data, site_template)
+    if progress is not None:
+        progress("rendering", 40)
     name = record["name"]
     bio = record["bio"]
     projects = record["projects"]
-    profiles_html = "\n".join(
+    profiles_html = "\n".join([
         f'<li><strong>{profile["network"]}</strong> : <a href="{profile["url"]}">{profile["url"]}</a></li>'
         for profile in record["profiles"]
-    ) or "<li>Non renseigné</li>"
-    skills_html = "\n".join(f'<span class="skill-tag">{skill}</span>' for skill in record["skills"]) or "<span>Aucune</span>"
-    education_html = "\n".join(
+    ]) or "<li>Non renseigné</li>"
+    skills_html = "\n".join([f'<span class="skill-tag">{skill}</span>' for skill in record["skills"]]) or "<span>Aucune</span>"
+    education_html = "\n".join([
         (
             '<div class="education-item">'
             f"<h3>{item['institution']}</h3>"
@@ -317,97 +565,86 @@ def generate_portfolio(
             "</div>"
         )
         for item in record["education"]
-    ) or '<div class="education-item"><h3>Formation non renseignée</h3></div>'
-
-    html_template = template_path.read_text(encoding="utf-8")
-    cards = "\n".join(
-        PROJECT_CARD_TEMPLATE.format(
-            image=project["image"],
-            title=project["title"],
-            description=project["description"],
-        )
+    ]) or '<div class="education-item"><h3>Formation non renseignée</h3></div>'
+
+    html_template = _html_template()
+    # Inline f-string: compiled to bytecode, no format string parsed per card
+    cards = "\n".join([
+        f"""                <div class="project-card">
+                    <img src="{project["image"]}" alt="{project["title"]}">
+                    <h3>{project["title"]}</h3>
+                    <p>{project["description"]}</p>
+                </div>"""
         for project in projects
+    ])
+    rendered_html = _render_template(
+        html_template,
+        {
+            "name": name,
+            "bio": bio,
+            "section_title": SECTION_TITLE_BY_TEMPLATE[site_template],
+            "photo_url": record["photo_url"],
+            "headline": record["headline"],
+            "contact_line": record["contact_line"],
+            "address_line": record["address_line"],
+            "profiles_html": profiles_html,
+            "skills_html": skills_html,
+            "education_html": education_html,
+            "projects_block": cards,
+        }
     )
-    rendered_html = html_template.replace("{{name}}", name).replace("{{bio}}", bio)
-    rendered_html = rendered_html.replace("{{section_title}}", SECTION_TITLE_BY_TEMPLATE[site_template])
-    rendered_html = rendered_html.replace("{{photo_url}}", record["photo_url"])
-    rendered_html = rendered_html.replace("{{headline}}", record["headline"])
-    rendered_html = rendered_html.replace("{{contact_line}}", record["contact_line"])
-    rendered_html = rendered_html.replace("{{address_line}}", record["address_line"])
-    rendered_html = rendered_html.replace("{{profiles_html}}", profiles_html)
-    rendered_html = rendered_html.replace("{{skills_html}}", skills_html)
-    rendered_html = rendered_html.replace("{{education_html}}", education_html)
-    rendered_html, replaced = re.subn(
-        r"\s*\{%\s*for project in projects\s*%\}.*?\{%\s*endfor\s*%\}",
-        f"\n{cards}",
-        rendered_html,
-        flags=re.DOTALL,
-    )
-    if replaced != 1:
-        raise ValueError(
-            "Template project loop block ({% for project in projects %}...{% endfor %}) not found or appears multiple times in template"
-        )
 
-    output_path.mkdir(parents=True, exist_ok=True)
-    (output_path / "styles").mkdir(parents=True, exist_ok=True)
-    (output_path / "admin").mkdir(parents=True, exist_ok=True)
-    (output_path / "data").mkdir(parents=True, exist_ok=True)
-
-    (output_path / "index.html").write_text(rendered_html, encoding="utf-8")
-    shutil.copy2(css_path, output_path / "styles" / "main.css")
-    (output_path / "admin" / "index.html").write_text(DECAP_ADMIN_INDEX, encoding="utf-8")
-    (output_path / "admin" / "config.yml").write_text(DECAP_CONFIG_YML, encoding="utf-8")
-    (output_path / "data" / "portfolio.json").write_text(
-        json.dumps(
-            {
-                "name": name,
-                "bio": bio,
-                "headline": record["headline"],
-                "photo_url": record["photo_url"],
-                "contact_line": record["contact_line"],
-                "address_line": record["address_line"],
-                "profiles": record["profiles"],
-                "skills": record["skills"],
-                "education": record["education"],
-                "projects": projects,
-            },
-            ensure_ascii=False,
-            indent=2,
-        ),
-        encoding="utf-8",
-    )
-    (output_path / "data" / "portfolio_document.json").write_text(
-        json.dumps(record, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-    (output_path / "data" / "portfolio_sql_projection.json").write_text(
-        json.dumps(_build_sql_projection(record), ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-    (output_path / "data" / "workflow_state.json").write_text(
-        json.dumps(
+    if progress is not None:
+        progress("writing", 70)
+    # Plain string paths: os.open takes them as-is, no PosixPath per file
+    styles_dir = os.path.join(root, "styles")
+    admin_dir = os.path.join(root, "admin")
+    data_dir = os.path.join(root, "data")
+    if not as_archive:
+        _make_dirs(root, (styles_dir, admin_dir, data_dir))
+
+    def site_files() -> Iterator[Tuple[str, bytes]]:
+        # Each payload is serialized just before it is written and dropped right
+        # after, so peak memory is the largest single file rather than the sum
+        yield os.path.join(root, "index.html"), rendered_html.encode("utf-8")
+        yield os.path.join(styles_dir, "main.css"), _theme_stylesheet(design_theme)
+        yield os.path.join(admin_dir, "index.html"), DECAP_ADMIN_INDEX_BYTES
+        yield os.path.join(admin_dir, "config.yml"), DECAP_CONFIG_YML_BYTES
+        yield os.path.join(data_dir, "portfolio.json"), _dump_json(_site_data(record))
+        yield os.path.join(data_dir, "portfolio_document.json"), _dump_json(record)
+        yield os.path.join(data_dir, "workflow_state.json"), _dump_json(
             {
                 "status": "draft",
                 "site_template": site_template,
                 "portfolio_id": record["portfolio_id"],
                 "editable_admin_url": "/admin/",
                 "design_theme": design_theme,
-            },
-            ensure_ascii=False,
-            indent=2,
-        ),
-        encoding="utf-8",
+            }
+        )
+        yield os.path.join(root, "netlify.toml"), NETLIFY_TOML_BYTES
+        if emit_sql_projection:
+            sql_projection = _build_sql_projection(record, sql_projects)
+            if sql_format == "msgpack":
+                from msgspec import msgpack
+
+                yield os.path.join(data_dir, "portfolio_sql_projection.msgpack"), msgpack.encode(sql_projection)
+            else:
+                yield os.path.join(data_dir, "portfolio_sql_projection.json"), _dump_json(sql_projection)
+
+    if as_archive:
+        response: Dict[str, Any] = {"archive": _zip_files(site_files())}
+    else:
+        _write_files(site_files())
+        response = {"path": root}
+    response.update(
+        {
+            "admin_url": "/admin/",
+            "portfolio_id": record["portfolio_id"],
+            "site_template": site_template,
+            "design_theme": design_theme,
+            "status": "draft",
+        }
     )
-    (output_path / "netlify.toml").write_text(NETLIFY_TOML, encoding="utf-8")
-
-    response = {
-        "path": str(output_path),
-        "admin_url": "/admin/",
-        "portfolio_id": record["portfolio_id"],
-        "site_template": site_template,
-        "design_theme": design_theme,
-        "status": "draft",
-    }
     if mongo_collection is not None:
         try:
             mongo_collection.insert_one(record)
@@ -415,9 +652,43 @@ def generate_portfolio(
         except Exception as error:  # pragma: no cover - depends on runtime DB availability
             response["storage"] = "mongodb_error"
             response["storage_error"] = str(error)
+    if progress is not None:
+        progress("done", 100)
     return response
 
 
+def generate_many(
+    payloads: List[Dict[str, Any]],
+    output_root: str = "dist",
+    workers: Optional[int] = None,
+    site_template: str = DEFAULT_TEMPLATE_MODE,
+    design_theme: str = DEFAULT_DESIGN_THEME,
+) -> List[Dict[str, str]]:
+    """Generate one static portfolio per payload in parallel worker processes.
+
+    Each site is written to ``output_root/<user_id>`` (only ``[A-Za-z0-9_-]`` kept), or
+    ``output_root/portfolio-<index>`` when the payload has no usable ``user_id``. A name already
+    taken in the batch (duplicate ids, ids equal once sanitized or differing only in case) gets
+    ``-<index>`` appended, so no two payloads share a directory. Every worker loads the template
+    and stylesheets once and reuses them for all the payloads it renders. Results are returned
+    in payload order.
+    """
+    root = Path(output_root).resolve()
+    output_dirs = []
+    # Compared case-insensitively: "Alice" and "alice" are one directory on macOS/Windows
+    taken = set()
+    for index, payload in enumerate(payloads):
+        user_id = str(payload.get("user_id") or (payload.get("basics") or {}).get("email") or "")
+        dir_name = safe_dir_name(user_id) or f"portfolio-{index}"
+        while dir_name.lower() in taken:
+            dir_name = f"{dir_name}-{index}"
+        taken.add(dir_name.lower())
+        output_dirs.append(str(root / dir_name))
+    generate_one = partial(generate_portfolio, site_template=site_template, design_theme=design_theme)
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_template_cache) as executor:
+        return list(executor.map(generate_one, payloads, output_dirs))
+
+
 def generate_astro_portfolio(
     user_data: Dict[str, Any],
     output_dir: str = "dist-astro",
@@ -430,10 +701,8 @@ def generate_astro_portfolio(
     if design_theme not in DESIGN_THEME_FILES:
         raise ValueError(f"Unsupported design_theme '{design_theme}'. Expected one of: {sorted(DESIGN_THEME_FILES)}")
     
-    base_dir = Path(__file__).resolve().parent
-    astro_template_dir = base_dir / "templates" / "astro"
-    css_path = base_dir / "templates" / "styles" / DESIGN_THEME_FILES[design_theme]
-    output_path = Path(output_dir).resolve()
+    astro_template_dir = TEMPLATES_DIR / "astro"
+    output_path = Path(os.path.abspath(output_dir))
     
     # Validate template directory exists
     if not astro_template_dir.exists():
@@ -454,57 +723,36 @@ def generate_astro_portfolio(
     record = build_portfolio_record(user_data, site_template=site_template)
     
     # Create Astro project structure
-    output_path.mkdir(parents=True, exist_ok=True)
-    (output_path / "src" / "layouts").mkdir(parents=True, exist_ok=True)
-    (output_path / "src" / "pages").mkdir(parents=True, exist_ok=True)
-    (output_path / "src" / "content" / "portfolio").mkdir(parents=True, exist_ok=True)
-    (output_path / "public" / "styles").mkdir(parents=True, exist_ok=True)
-    
-    # Copy Astro template files
-    # Copy Layout.astro
-    layout_src = astro_template_dir / "src" / "layouts" / "Layout.astro"
-    shutil.copy2(layout_src, output_path / "src" / "layouts" / "Layout.astro")
-    
-    # Copy index.astro
-    index_src = astro_template_dir / "src" / "pages" / "index.astro"
-    shutil.copy2(index_src, output_path / "src" / "pages" / "index.astro")
-    
-    # Copy config files
-    for config_file in ["astro.config.mjs", "package.json", "README.md"]:
-        config_src = astro_template_dir / config_file
-        if config_src.exists():
-            shutil.copy2(config_src, output_path / config_file)
+    _make_dirs(
+        str(output_path),
+        [
+            str(output_path / sub_dir)
+            for sub_dir in ("src", "src/layouts", "src/pages", "src/content", "src/content/portfolio", "public", "public/styles")
+        ],
+    )
     
-    # Copy CSS to public folder
-    shutil.copy2(css_path, output_path / "public" / "styles" / "main.css")
+    # Astro template files come from the asset cache: no per-call reads or copies
+    template_files = ["src/layouts/Layout.astro", "src/pages/index.astro", "astro.config.mjs", "package.json"]
+    if (astro_template_dir / "README.md").exists():
+        template_files.append("README.md")
     
     # Write portfolio data as JSON for Astro
-    portfolio_data = {
-        "name": record["name"],
-        "bio": record["bio"],
-        "headline": record["headline"],
-        "photo_url": record["photo_url"],
-        "contact_line": record["contact_line"],
-        "address_line": record["address_line"],
-        "profiles": record["profiles"],
-        "skills": record["skills"],
-        "education": record["education"],
-        "projects": record["projects"],
-        "section_title": SECTION_TITLE_BY_TEMPLATE[site_template]
-    }
+    portfolio_data = _site_data(record)
+    portfolio_data["section_title"] = SECTION_TITLE_BY_TEMPLATE[site_template]
     
-    (output_path / "src" / "content" / "portfolio" / "data.json").write_text(
-        json.dumps(portfolio_data, ensure_ascii=False, indent=2),
-        encoding="utf-8"
+    # Template files, CSS in the public folder, content data and .gitignore go out in one pass
+    _write_files(
+        [
+            *[
+                (str(output_path / relative_path), _asset_bytes(astro_template_dir / relative_path))
+                for relative_path in template_files
+            ],
+            (str(output_path / "public" / "styles" / "main.css"), _theme_stylesheet(design_theme)),
+            (str(output_path / "src" / "content" / "portfolio" / "data.json"), _dump_json(portfolio_data)),
+            (str(output_path / ".gitignore"), ASTRO_GITIGNORE_BYTES),
+        ]
     )
     
-    # Create .gitignore
-    gitignore_content = """node_modules/
-dist/
-.astro/
-"""
-    (output_path / ".gitignore").write_text(gitignore_content, encoding="utf-8")
-    
     return {
         "path": str(output_path),
         "type": "astro",
@@ -517,7 +765,11 @@ dist/
     }
 
 
-def main() -> None:
+@lru_cache(maxsize=None)
+def _build_parser() -> "argparse.ArgumentParser":
+    # Built on first CLI use only; importing the module for generate_portfolio() never pays for it
+    import argparse
+
     parser = argparse.ArgumentParser(description="Generate or validate a static portfolio site from a JSON payload.")
     parser.add_argument("--input", help="Path to a JSON file containing portfolio or CV input data")
     parser.add_argument("--output-dir", default="dist", help="Output directory for generated static site")
@@ -533,8 +785,18 @@ def main() -> None:
         default=DEFAULT_DESIGN_THEME,
         help="Design theme to generate: classic, modern, contrast, or artistic",
     )
+    parser.add_argument(
+        "--sql-projection",
+        choices=sorted(SQL_PROJECTION_FORMATS),
+        help="Also write the SQL-friendly projection in this format (json or msgpack)",
+    )
     parser.add_argument("--validate", action="store_true", help="Mark an existing generated draft as validated")
     parser.add_argument("--astro", action="store_true", help="Generate an Astro-based portfolio instead of static HTML")
+    return parser
+
+
+def main() -> None:
+    parser = _build_parser()
     args = parser.parse_args()
 
     if args.validate:
@@ -542,7 +804,7 @@ def main() -> None:
     else:
         if not args.input:
             raise ValueError("--input is required unless --validate is used")
-        payload = json.loads(Path(args.input).read_text(encoding="utf-8"))
+        payload = _load_json(Path(args.input).read_bytes())
         
         if args.astro:
             # Generate Astro-based portfolio
@@ -561,6 +823,8 @@ def main() -> None:
                 output_dir=args.output_dir,
                 site_template=args.site_template,
                 design_theme=args.design_theme,
+                emit_sql_projection=args.sql_projection is not None,
+                sql_format=args.sql_projection or "json",
             )
     print(json.dumps(result))
 
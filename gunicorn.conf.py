@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for the Portfolio Generator API.
+
+Loaded automatically by ``gunicorn api_server:app`` when run from this
+directory, and used by ``python api_server.py`` outside debug mode.
+
+A single gevent worker serves many concurrent I/O-bound requests (SSE
+progress streams, portfolio reads, callbacks). Pending portfolio.json
+writes, regeneration timers and background jobs are per-process state, so
+it is the default: with several workers, a read or merge routed to another
+worker misses pending updates, bursts stop coalescing and /progress/<job_id>
+only works when routed to the worker that accepted the job. Only raise
+GUNICORN_WORKERS behind sticky routing per portfolio and job.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
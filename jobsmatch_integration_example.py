@@ -5,15 +5,53 @@ This file demonstrates how JobsMatch can integrate with the Portfolio Generator
 to enable users to create and manage their portfolios.
 """
 
-import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 class PortfolioAPIClient:
     """Client for Portfolio Generator API."""
     
     def __init__(self, api_base_url: str = "http://localhost:5000"):
+        # Imported here rather than at module load, so importing this module stays cheap
+        import threading
+        
+        import orjson
+        
         self.api_base_url = api_base_url.rstrip('/')
+        # Bodies are encoded/decoded with orjson instead of requests' stdlib json
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        # requests.Session is not documented as thread-safe: each thread
+        # (e.g. create_portfolios workers) gets its own, built on first use
+        self._local = threading.local()
+    
+    @property
+    def _session(self):
+        """Pooled session of the calling thread."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            # Keep-alive connections are reused across calls instead of a new
+            # TCP/TLS handshake per request. Only GETs are retried: a PUT that
+            # got a 502/503/504 may already have been merged (and restarted the
+            # regeneration debounce), and creation must never be replayed.
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({"GET"}),
+                ),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Content-Type"] = "application/json"
+            self._local.session = session
+        return session
     
     def create_portfolio(
         self,
@@ -61,21 +99,49 @@ class PortfolioAPIClient:
         if callback_url:
             portfolio_data["callback_url"] = callback_url
         
-        response = requests.post(
+        response = self._session.post(
             f"{self.api_base_url}/api/generate",
-            json=portfolio_data
+            data=self._dumps(portfolio_data)
         )
         
         response.raise_for_status()
-        return response.json()
+        return self._loads(response.content)
+    
+    def create_portfolios(
+        self,
+        users: List[Dict[str, Any]],
+        workers: int = 8,
+        **options: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Create portfolios for many JobsMatch users at once (e.g. migrating existing users).
+        
+        Requests are issued from a thread pool, each thread with its own pooled
+        session; each thread mostly waits on the API, so the GIL is not a bottleneck.
+        
+        Args:
+            users: User data dicts from JobsMatch, each with an "id" key
+            workers: Number of concurrent requests (at most 32)
+            **options: Forwarded to create_portfolio (site_template, design_theme, callback_url)
+        
+        Returns:
+            API responses, in the same order as users
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=min(workers, 32)) as executor:
+            return list(executor.map(
+                lambda user: self.create_portfolio(user_id=user["id"], user_data=user, **options),
+                users
+            ))
     
     def get_portfolio(self, portfolio_id: str) -> Dict[str, Any]:
         """Get portfolio data by ID."""
-        response = requests.get(
+        response = self._session.get(
             f"{self.api_base_url}/api/portfolio/{portfolio_id}"
         )
         response.raise_for_status()
-        return response.json()
+        return self._loads(response.content)
     
     def update_portfolio(
         self,
@@ -86,20 +152,20 @@ class PortfolioAPIClient:
         """Update an existing portfolio."""
         data = {**updated_data, "regenerate": regenerate}
         
-        response = requests.put(
+        response = self._session.put(
             f"{self.api_base_url}/api/portfolio/{portfolio_id}",
-            json=data
+            data=self._dumps(data)
         )
         response.raise_for_status()
-        return response.json()
+        return self._loads(response.content)
     
     def validate_portfolio(self, portfolio_id: str) -> Dict[str, Any]:
         """Mark portfolio as validated."""
-        response = requests.post(
+        response = self._session.post(
             f"{self.api_base_url}/api/portfolio/{portfolio_id}/validate"
         )
         response.raise_for_status()
-        return response.json()
+        return self._loads(response.content)
     
     def get_editor_url(self, portfolio_id: Optional[str] = None) -> str:
         """Get URL to the manual editor."""
@@ -361,6 +427,24 @@ def example_5_webhook_handler():
     return app
 
 
+def example_6_batch_onboarding(users: List[Dict[str, Any]]):
+    """Example 6: Create portfolios for existing JobsMatch users in bulk."""
+    
+    client = PortfolioAPIClient("http://portfolio-api.example.com")
+    
+    # Each user has the same shape as in example 1
+    results = client.create_portfolios(
+        users,
+        workers=16,
+        site_template="hybrid",
+        design_theme="modern",
+        callback_url="https://jobsmatch.com/api/webhook/portfolio-created"
+    )
+    
+    print(f"Created {len(results)} portfolios")
+    return results
+
+
 # Django Integration Example
 def django_integration_example():
     """Example integration with Django-based JobsMatch."""
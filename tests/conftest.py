@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The modules under test live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Generated sites are many small files: keep tmp_path (and any mkdtemp) on tmpfs when
+# available. tempfile caches its directory on first use, which pytest has already
+# triggered by the time this conftest loads, so the module attribute is set directly.
+if "TMPDIR" not in os.environ and os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+    tempfile.tempdir = "/dev/shm"
+
+
+@pytest.fixture(scope="session")
+def monkeypatch_session():
+    """Session-scoped counterpart of ``monkeypatch``: patches are applied once and undone at exit."""
+    patch = pytest.MonkeyPatch()
+    yield patch
+    patch.undo()
+
+
+@pytest.fixture(scope="session")
+def portfolios_root(tmp_path_factory, monkeypatch_session):
+    """Point the API's output directory and registry database at one session-wide temp dir."""
+    import api_server
+
+    root = tmp_path_factory.mktemp("portfolios")
+    monkeypatch_session.setattr(api_server, "PORTFOLIOS_DIR", root)
+    monkeypatch_session.setattr(api_server, "PORTFOLIO_REGISTRY", api_server.PortfolioRegistry(root / "registry.db"))
+    return root
+
+
+@pytest.fixture(scope="session")
+def client(portfolios_root, monkeypatch_session):
+    """One Flask test client for the whole run; it holds no per-test state."""
+    from api_server import app
+
+    monkeypatch_session.setitem(app.config, "TESTING", True)
+    return app.test_client()
+
+
+@pytest.fixture(scope="module")
+def clean_registry(portfolios_root):
+    """Start a test module from an empty portfolio registry."""
+    import api_server
+
+    api_server.PORTFOLIO_REGISTRY.clear()
+    yield
+
+
+@pytest.fixture
+def registry_snapshot(portfolios_root):
+    """Drop the registry entries a test creates, keeping those made by shared fixtures before it."""
+    import api_server
+
+    before = set(api_server.PORTFOLIO_REGISTRY)
+    yield
+    for portfolio_id in set(api_server.PORTFOLIO_REGISTRY) - before:
+        del api_server.PORTFOLIO_REGISTRY[portfolio_id]
+
+
+@pytest.fixture(scope="module")
+def sample_portfolio(client, clean_registry):
+    """Generate one portfolio per module for read/update/validate tests that only need an id."""
+    response = client.post(
+        "/api/generate",
+        json={"user_id": "shared-sample", "basics": {"name": "Shared Sample", "summary": "Shared bio"}},
+    )
+    assert response.status_code == 201
+    return response.get_json()["portfolio_id"]
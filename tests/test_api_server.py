@@ -0,0 +1,733 @@
+"""
+Tests for the Portfolio Generator API Server
+
+Run with: python -m pytest tests/test_api_server.py -v
+"""
+
+import gzip
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import get_args
+from unittest import mock
+
+import orjson
+import pytest
+
+import api_server
+import generate_portfolio as generator
+
+pytestmark = pytest.mark.usefixtures("clean_registry", "registry_snapshot")
+
+_EXPECTED_INDEX_KEYS = frozenset({"service", "endpoints"})
+
+# Request bodies are serialized by the test client and never mutated, so tests share them
+_BASIC_PAYLOAD = {
+    "user_id": "test-user-123",
+    "basics": {
+        "name": "Test User",
+        "summary": "Test bio",
+        "email": "test@example.com"
+    },
+    "projects": [
+        {
+            "name": "Test Project",
+            "description": "Test description"
+        }
+    ],
+    "site_template": "hybrid",
+    "design_theme": "modern"
+}
+
+_MINIMAL_PAYLOAD = {
+    "basics": {
+        "name": "Minimal User",
+        "summary": "Minimal bio"
+    }
+}
+
+_CALLBACK_PAYLOAD = {
+    "user_id": "callback-test-user",
+    "basics": {"name": "Callback User"},
+    "callback_url": "https://example.com/webhook"
+}
+
+_ASYNC_PAYLOAD = {
+    "user_id": "async-test-user",
+    "basics": {"name": "Async User"},
+    "async": True
+}
+
+_ASTRO_PAYLOAD = {
+    "user_id": "astro-test-user-001",
+    "basics": {
+        "name": "Astro Test User",
+        "summary": "Astro test bio"
+    },
+    "projects": [
+        {
+            "name": "Test Astro Project",
+            "description": "Testing Astro generation"
+        }
+    ]
+}
+
+_EDITOR_NEW_PAYLOAD = {
+    "user_id": "editor-test-user",
+    "data": {
+        "basics": {
+            "name": "Editor Test User",
+            "summary": "Created from editor"
+        }
+    },
+    "site_template": "portfolio",
+    "design_theme": "classic"
+}
+
+
+def _fake_generate_portfolio(user_data, output_dir="dist", site_template="hybrid",
+                             design_theme="classic", progress=None, **kwargs):
+    """Write just the files the API reads back, skipping template rendering."""
+    if progress is not None:
+        for stage, pct in (("building_record", 10), ("rendering", 40), ("writing", 70)):
+            progress(stage, pct)
+    portfolio_id = str(uuid.uuid4())
+    payload = generator.normalize_input_payload(user_data, site_template=site_template)
+    root = Path(os.path.abspath(output_dir))
+    (root / "data").mkdir(parents=True, exist_ok=True)
+    (root / "index.html").write_text(f"<html><body><h1>{payload.get('name') or ''}</h1></body></html>", encoding="utf-8")
+    (root / "data" / "portfolio.json").write_bytes(orjson.dumps({
+        "name": payload.get("name") or "",
+        "bio": payload.get("bio") or "",
+        "projects": payload.get("projects") or [],
+    }))
+    (root / "data" / "workflow_state.json").write_bytes(orjson.dumps({
+        "status": "draft",
+        "site_template": site_template,
+        "portfolio_id": portfolio_id,
+        "design_theme": design_theme,
+    }))
+    if progress is not None:
+        progress("done", 100)
+    return {
+        "path": str(root),
+        "admin_url": "/admin/",
+        "portfolio_id": portfolio_id,
+        "site_template": site_template,
+        "design_theme": design_theme,
+        "status": "draft",
+    }
+
+
+@pytest.fixture(scope="module", autouse=True)
+def fake_generator():
+    """API tests check routing, status codes and the registry, not rendering:
+    the full generator is covered by test_generate_portfolio.py."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(api_server, "generate_portfolio", _fake_generate_portfolio)
+        yield
+
+
+def _create(client, user_id, name, **extra):
+    """Create a portfolio through the API and return the response body."""
+    response = client.post('/api/generate', json={"user_id": user_id, "basics": {"name": name}, **extra})
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def _wait_for_regeneration(portfolio_id):
+    """Join the debounced regeneration; the timer drops its own entry once it has rendered."""
+    timer = api_server.REGEN_TIMERS.get(portfolio_id)
+    if timer is not None:
+        timer.join()
+
+
+@pytest.fixture
+def real_generator(monkeypatch):
+    """Run a test end to end through the real site generator."""
+    monkeypatch.setattr(api_server, "generate_portfolio", generator.generate_portfolio)
+
+
+# API endpoints
+
+def test_health_check(client):
+    """Test health check endpoint."""
+    response = client.get('/health')
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert data['status'] == 'healthy'
+    assert data['service'] == 'portfolio-generator-api'
+
+
+def test_index_endpoint(client):
+    """Test API documentation index."""
+    response = client.get('/')
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert _EXPECTED_INDEX_KEYS <= data.keys()
+    assert data['service'] == 'Portfolio Generator API'
+
+
+def test_generate_portfolio_basic(client, real_generator):
+    """Test basic portfolio generation via API, end to end through the real generator."""
+    response = client.post('/api/generate', json=_BASIC_PAYLOAD)
+
+    assert response.status_code == 201
+
+    data = response.get_json()
+    assert data['success']
+    assert 'portfolio_id' in data
+    assert 'portfolio_url' in data
+    assert 'editor_url' in data
+    assert 'admin_url' in data
+    assert data['site_template'] == 'hybrid'
+    assert data['design_theme'] == 'modern'
+
+    # Verify portfolio was registered
+    portfolio_id = data['portfolio_id']
+    assert portfolio_id in api_server.PORTFOLIO_REGISTRY
+
+
+def test_generate_portfolio_minimal_data(client):
+    """Test portfolio generation with minimal data."""
+    response = client.post('/api/generate', json=_MINIMAL_PAYLOAD)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['success']
+
+
+def test_generate_portfolio_empty_object(client):
+    """Test that an empty JSON object is a valid request: every field is optional."""
+    response = client.post('/api/generate', json={})
+
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['success']
+    assert data['portfolio_url'].startswith('/portfolios/portfolio-')
+
+
+def test_generate_portfolio_sends_callback(client):
+    """Test that callback_url is notified off the request thread."""
+    with mock.patch.object(api_server.CALLBACK_EXECUTOR, "submit") as submit:
+        response = client.post('/api/generate', json=_CALLBACK_PAYLOAD)
+
+    assert response.status_code == 201
+    data = response.get_json()
+    submit.assert_called_once()
+    callback, callback_url, payload = submit.call_args[0]
+    assert callback is api_server._post_callback
+    assert callback_url == "https://example.com/webhook"
+    assert payload['portfolio_id'] == data['portfolio_id']
+
+
+def test_generate_portfolio_async_streams_progress(client):
+    """Test background generation with SSE progress streaming."""
+    response = client.post('/api/generate', json=_ASYNC_PAYLOAD)
+
+    assert response.status_code == 202
+    data = response.get_json()
+    assert data['success']
+    assert data['progress_url'] == f"/progress/{data['job_id']}"
+
+    progress_response = client.get(data['progress_url'])
+    assert progress_response.mimetype == 'text/event-stream'
+    events = [
+        orjson.loads(line[len(b'data: '):])
+        for line in progress_response.get_data().splitlines()
+        if line.startswith(b'data: ')
+    ]
+    assert events[-1]['type'] == 'done'
+    assert 'rendering' in [event.get('stage') for event in events]
+    assert events[-1]['portfolio_id'] in api_server.PORTFOLIO_REGISTRY
+
+    # Finished jobs are forgotten once streamed
+    assert client.get(data['progress_url']).status_code == 404
+
+
+def test_progress_queue_released_on_disconnect(client):
+    """Test that a stream closed before the terminal event still releases the job queue."""
+    job_id = 'job-disconnect'
+    api_server.JOB_QUEUES[job_id] = job_queue = api_server.queue.Queue()
+    job_queue.put({"type": "progress", "stage": "rendering", "pct": 40})
+
+    response = client.get(f'/progress/{job_id}', buffered=False)
+    assert next(iter(response.response)).startswith(b'data: ')
+    response.close()
+
+    assert job_id not in api_server.JOB_QUEUES
+
+
+def test_job_survives_stream_closed_before_it_starts(client, monkeypatch):
+    """Test that a queued job still runs after its progress stream gave up on it."""
+    # One busy worker keeps the job queued while its stream is opened and closed
+    executor = api_server.ThreadPoolExecutor(max_workers=1)
+    busy = threading.Event()
+    executor.submit(busy.wait, 5)
+    monkeypatch.setattr(api_server, "JOB_EXECUTOR", executor)
+    monkeypatch.setattr(api_server, "PROGRESS_HEARTBEAT_INTERVAL", 0.01)
+
+    job_id = client.post('/api/generate', json={**_ASYNC_PAYLOAD, "user_id": "async-closed-user"}).get_json()['job_id']
+    response = client.get(f'/progress/{job_id}', buffered=False)
+    assert next(iter(response.response)) == b': heartbeat\n\n'
+    response.close()
+    assert job_id not in api_server.JOB_QUEUES
+
+    busy.set()
+    executor.shutdown(wait=True)
+    assert [
+        entry for entry in api_server.PORTFOLIO_REGISTRY.values() if entry['user_id'] == 'async-closed-user'
+    ]
+
+
+def test_unstreamed_job_queue_expires(client, monkeypatch):
+    """Test that finished jobs nobody subscribed to do not keep their queue forever."""
+    monkeypatch.setattr(api_server, "JOB_QUEUE_TTL", 0)
+    job_id = client.post('/api/generate', json=_ASYNC_PAYLOAD).get_json()['job_id']
+
+    deadline = time.monotonic() + 5
+    while job_id not in api_server.JOB_EXPIRES and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    # Expired jobs are swept on the next access, without a timer per job
+    assert client.get(f'/progress/{job_id}').status_code == 404
+    assert job_id not in api_server.JOB_QUEUES
+    assert job_id not in api_server.JOB_EXPIRES
+
+
+def test_option_literals_match_generator():
+    """Test that the spelled-out request literals stay in sync with the generator."""
+    assert set(get_args(api_server.SiteTemplate)) == generator.TEMPLATE_MODES
+    assert set(get_args(api_server.DesignTheme)) == set(generator.DESIGN_THEME_FILES)
+
+
+def test_generate_portfolio_rejects_invalid_options(client):
+    """Test that malformed control fields are rejected with 400."""
+    for invalid_data in (
+        {"basics": {"name": "Bad Template"}, "site_template": "unknown"},
+        {"basics": {"name": "Bad Theme"}, "design_theme": "neon"},
+        {"basics": {"name": "Bad User"}, "user_id": 123},
+        ["not", "an", "object"],
+    ):
+        response = client.post('/api/generate', json=invalid_data)
+        assert response.status_code == 400, invalid_data
+        assert 'Invalid request' in response.get_json()['error']
+
+
+def test_generate_portfolio_no_json(client):
+    """Test portfolio generation without JSON data."""
+    response = client.post('/api/generate')
+
+    assert response.status_code == 400
+    data = response.get_json()
+    assert 'error' in data
+
+
+def test_generate_astro_portfolio_basic(client):
+    """Test Astro-based portfolio generation endpoint."""
+    response = client.post('/api/generate-astro', json=_ASTRO_PAYLOAD)
+
+    assert response.status_code == 201
+    data = response.get_json()
+
+    assert data['success']
+    assert data['type'] == 'astro'
+    assert 'portfolio_id' in data
+    assert 'dev_command' in data
+    assert 'build_command' in data
+
+    # Verify portfolio was registered
+    portfolio_id = data['portfolio_id']
+    assert portfolio_id in api_server.PORTFOLIO_REGISTRY
+    assert api_server.PORTFOLIO_REGISTRY[portfolio_id]['type'] == 'astro'
+
+
+def test_get_portfolio_not_found(client):
+    """Test getting non-existent portfolio."""
+    response = client.get('/api/portfolio/non-existent-id')
+
+    assert response.status_code == 404
+    data = response.get_json()
+    assert 'error' in data
+
+
+def test_get_portfolio_success(client, sample_portfolio):
+    """Test getting portfolio data."""
+    portfolio_id = sample_portfolio
+
+    get_response = client.get(f'/api/portfolio/{portfolio_id}')
+
+    assert get_response.status_code == 200
+    get_data = get_response.get_json()
+
+    assert get_data['portfolio_id'] == portfolio_id
+    assert 'data' in get_data
+    assert 'metadata' in get_data
+    assert 'name' in get_data['data']
+
+
+def test_get_portfolio_conditional_request(client):
+    """Test that unchanged portfolio data is answered with 304."""
+    portfolio_id = _create(client, "test-user-etag", "ETag User")['portfolio_id']
+
+    first = client.get(f'/api/portfolio/{portfolio_id}')
+    assert first.status_code == 200
+    assert first.headers.get('ETag') is not None
+    assert first.headers.get('Last-Modified') is not None
+
+    by_etag = client.get(
+        f'/api/portfolio/{portfolio_id}',
+        headers={'If-None-Match': first.headers['ETag']}
+    )
+    assert by_etag.status_code == 304
+    assert by_etag.data == b''
+
+    by_date = client.get(
+        f'/api/portfolio/{portfolio_id}',
+        headers={'If-Modified-Since': first.headers['Last-Modified']}
+    )
+    assert by_date.status_code == 304
+
+    stale = client.get(
+        f'/api/portfolio/{portfolio_id}',
+        headers={'If-None-Match': 'W/"stale"'}
+    )
+    assert stale.status_code == 200
+
+
+def test_get_portfolio_compressed(client):
+    """Test that large portfolio JSON responses are gzip-compressed."""
+    portfolio_id = _create(
+        client, "test-user-gzip", "Gzip User",
+        projects=[
+            {"name": f"Project {index}", "description": "Description " * 10}
+            for index in range(20)
+        ]
+    )['portfolio_id']
+
+    response = client.get(
+        f'/api/portfolio/{portfolio_id}',
+        headers={'Accept-Encoding': 'gzip'}
+    )
+
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    data = orjson.loads(gzip.decompress(response.data))
+    assert len(data['data']['projects']) == 20
+
+
+def test_update_portfolio_not_found(client):
+    """Test updating non-existent portfolio."""
+    response = client.put(
+        '/api/portfolio/non-existent-id',
+        json={"name": "Updated"}
+    )
+
+    assert response.status_code == 404
+
+
+def test_update_portfolio_success(client, sample_portfolio):
+    """Test updating portfolio."""
+    portfolio_id = sample_portfolio
+
+    update_data = {
+        "name": "Updated Name",
+        "bio": "Updated bio",
+        "regenerate": False  # Skip regeneration for faster test
+    }
+
+    update_response = client.put(f'/api/portfolio/{portfolio_id}', json=update_data)
+
+    assert update_response.status_code == 200
+    update_result = update_response.get_json()
+
+    assert update_result['success']
+    assert update_result['portfolio_id'] == portfolio_id
+    assert 'updated_at' in update_result
+
+
+def test_get_portfolio_reflects_update(client):
+    """Test that cached portfolio reads are invalidated by updates."""
+    portfolio_id = _create(client, "test-user-cache", "Cached Name")['portfolio_id']
+
+    first = client.get(f'/api/portfolio/{portfolio_id}').get_json()
+    assert first['data']['name'] == 'Cached Name'
+
+    client.put(
+        f'/api/portfolio/{portfolio_id}',
+        json={"name": "Freshly Updated Name", "regenerate": False}
+    )
+
+    second = client.get(f'/api/portfolio/{portfolio_id}').get_json()
+    assert second['data']['name'] == 'Freshly Updated Name'
+
+
+def test_update_portfolio_coalesces_regeneration(client):
+    """Test that a burst of updates triggers a single regeneration."""
+    portfolio_id = _create(client, "test-user-burst", "Burst User")['portfolio_id']
+
+    with mock.patch.object(api_server, "generate_portfolio") as generate:
+        for index in range(5):
+            response = client.put(
+                f'/api/portfolio/{portfolio_id}',
+                json={"bio": f"Draft {index}"}
+            )
+            assert response.status_code == 202
+        _wait_for_regeneration(portfolio_id)
+
+    generate.assert_called_once()
+    assert generate.call_args[0][0]['basics']['summary'] == 'Draft 4'
+
+
+def test_full_replace_is_visible_before_regeneration(client):
+    """Test that a debounced full replace is not lost to a merge arriving before the render."""
+    portfolio_id = _create(client, "test-user-replace", "Orig")['portfolio_id']
+
+    response = client.put(
+        f'/api/portfolio/{portfolio_id}',
+        json={"name": "New", "bio": "Replaced", "full_replace": True}
+    )
+    assert response.status_code == 202
+    assert response.get_json()['persisted'] == 'pending'
+    assert client.get(f'/api/portfolio/{portfolio_id}').get_json()['data']['name'] == 'New'
+
+    # The pending render must not overwrite this merge with the replaced document
+    response = client.put(
+        f'/api/portfolio/{portfolio_id}',
+        json={"bio": "Merged", "regenerate": False}
+    )
+    assert response.get_json()['regenerate_scheduled']
+    _wait_for_regeneration(portfolio_id)
+
+    get_data = client.get(f'/api/portfolio/{portfolio_id}').get_json()
+    assert get_data['data']['name'] == 'New'
+    assert get_data['data']['bio'] == 'Merged'
+
+
+def test_full_replace_keeps_project_ids_through_regeneration(client, real_generator):
+    """Test that project ids read before a debounced render are the ones it writes."""
+    portfolio_id = _create(client, "test-user-replace-ids", "Ids User")['portfolio_id']
+
+    response = client.put(
+        f'/api/portfolio/{portfolio_id}',
+        json={
+            "basics": {"name": "Ids User", "email": "ids@example.com"},
+            "projects": [{"name": "First", "description": ""}, {"name": "Second", "description": ""}],
+            "full_replace": True,
+        }
+    )
+    assert response.status_code == 202
+    interim = client.get(f'/api/portfolio/{portfolio_id}').get_json()['data']
+    _wait_for_regeneration(portfolio_id)
+    rendered = client.get(f'/api/portfolio/{portfolio_id}').get_json()['data']
+
+    assert [project['project_id'] for project in rendered['projects']] == [
+        project['project_id'] for project in interim['projects']
+    ]
+    assert [project['title'] for project in rendered['projects']] == ['First', 'Second']
+    assert rendered['contact_line'] == 'ids@example.com'
+
+
+def test_update_portfolio_coalesces_writes(client):
+    """Test that a burst of updates is written to disk once, in the background."""
+    portfolio_id = _create(client, "test-user-writes", "Writer User")['portfolio_id']
+    data_file = Path(api_server.PORTFOLIO_REGISTRY[portfolio_id]['path']) / 'data' / 'portfolio.json'
+
+    writer = api_server.PortfolioWriter(coalesce_seconds=60)
+    with mock.patch.object(api_server, "PORTFOLIO_WRITER", writer), \
+            mock.patch.object(api_server.PortfolioWriter, "_write", wraps=api_server.PortfolioWriter._write) as write:
+        for index in range(5):
+            response = client.put(
+                f'/api/portfolio/{portfolio_id}',
+                json={"bio": f"Draft {index}", "regenerate": False}
+            )
+            assert response.get_json()['persisted'] == 'pending'
+
+        # Reads see the pending update before it reaches the disk
+        get_data = client.get(f'/api/portfolio/{portfolio_id}').get_json()
+        assert get_data['data']['bio'] == 'Draft 4'
+
+        response = client.put(
+            f'/api/portfolio/{portfolio_id}',
+            json={"name": "Synced", "regenerate": False, "sync": True}
+        )
+        assert response.get_json()['persisted'] == 'written'
+
+    write.assert_called_once()
+    stored = orjson.loads(data_file.read_bytes())
+    assert stored['bio'] == 'Draft 4'
+    assert stored['name'] == 'Synced'
+    assert 'sync' not in stored
+
+
+def test_update_during_background_write_is_not_lost(client):
+    """Test that a merge arriving while the writer is mid-write sees the update being written."""
+    portfolio_id = _create(client, "test-user-midwrite", "Midwrite User")['portfolio_id']
+    data_file = Path(api_server.PORTFOLIO_REGISTRY[portfolio_id]['path']) / 'data' / 'portfolio.json'
+
+    started, release = threading.Event(), threading.Event()
+    real_write = api_server.PortfolioWriter._write
+
+    def slow_write(path, data):
+        started.set()
+        release.wait(5)
+        real_write(path, data)
+
+    writer = api_server.PortfolioWriter(coalesce_seconds=0)
+    with mock.patch.object(api_server, "PORTFOLIO_WRITER", writer), \
+            mock.patch.object(api_server.PortfolioWriter, "_write", side_effect=slow_write):
+        client.put(f'/api/portfolio/{portfolio_id}', json={"bio": "First", "regenerate": False})
+        assert started.wait(5)
+        client.put(f'/api/portfolio/{portfolio_id}', json={"name": "Second", "regenerate": False})
+        release.set()
+        writer.flush()
+
+    stored = orjson.loads(data_file.read_bytes())
+    assert stored['bio'] == 'First'
+    assert stored['name'] == 'Second'
+
+
+def test_validate_portfolio_not_found(client):
+    """Test validating non-existent portfolio."""
+    response = client.post('/api/portfolio/non-existent-id/validate')
+
+    assert response.status_code == 404
+
+
+def test_validate_portfolio_success(client, sample_portfolio):
+    """Test validating portfolio."""
+    portfolio_id = sample_portfolio
+
+    validate_response = client.post(
+        f'/api/portfolio/{portfolio_id}/validate'
+    )
+
+    assert validate_response.status_code == 200
+    validate_data = validate_response.get_json()
+
+    assert validate_data['success']
+    assert validate_data['status'] == 'validated'
+
+
+def test_registry_is_shared_across_connections():
+    """Test that registry entries are persisted for other workers."""
+    api_server.PORTFOLIO_REGISTRY["shared-id"] = {
+        "portfolio_id": "shared-id",
+        "user_id": "shared-user",
+        "path": "/tmp/shared",
+        "site_template": "hybrid",
+        "design_theme": "classic",
+        "created_at": "2026-01-01T00:00:00+00:00",
+        "callback_url": None
+    }
+
+    other_worker_registry = api_server.PortfolioRegistry(api_server.PORTFOLIO_REGISTRY.db_path)
+    assert "shared-id" in other_worker_registry
+    assert other_worker_registry["shared-id"]["user_id"] == "shared-user"
+    assert "type" not in other_worker_registry["shared-id"]
+
+
+def test_editor_endpoint(client):
+    """Test serving the manual editor."""
+    response = client.get('/editor')
+
+    # Should return the HTML file
+    assert response.status_code == 200
+    assert response.mimetype == 'text/html'
+    assert b'<html' in response.data[:512]
+
+    # Revalidating with the ETag skips the body
+    cached = client.get('/editor', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.data == b''
+
+
+def test_serve_portfolio_via_x_accel_redirect(client):
+    """Test that static portfolio files can be offloaded to nginx."""
+    created = _create(client, "test-user-accel", "Accel User")
+    site_dir = Path(api_server.PORTFOLIO_REGISTRY[created['portfolio_id']]['path'])
+    (site_dir / "my cv #1.html").write_bytes(b"<html></html>")
+
+    with mock.patch.object(api_server, "X_ACCEL_REDIRECT_PREFIX", "/_portfolios/"):
+        response = client.get(created['portfolio_url'])
+        spaced_response = client.get('/portfolios/test-user-accel/my%20cv%20%231.html')
+        missing_response = client.get('/portfolios/test-user-accel/missing.html')
+
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == '/_portfolios/test-user-accel/index.html'
+    assert response.data == b''
+    assert spaced_response.headers['X-Accel-Redirect'] == '/_portfolios/test-user-accel/my%20cv%20%231.html'
+    assert missing_response.status_code == 404
+
+
+def test_editor_save_new_portfolio(client):
+    """Test saving from editor (new portfolio)."""
+    response = client.post('/api/editor/save', json=_EDITOR_NEW_PAYLOAD)
+
+    # Should create new portfolio
+    assert response.status_code in [200, 201]
+
+    # The portfolio is built from the nested "data" document
+    portfolio_id = response.get_json()['portfolio_id']
+    get_data = client.get(f'/api/portfolio/{portfolio_id}').get_json()
+    assert get_data['data']['name'] == 'Editor Test User'
+
+
+def test_editor_save_existing_portfolio(client):
+    """Test saving from editor (existing portfolio) replaces the document."""
+    portfolio_id = _create(client, "editor-update-user", "Before Save")['portfolio_id']
+
+    response = client.post(
+        '/api/editor/save',
+        json={
+            "portfolio_id": portfolio_id,
+            "data": {
+                "basics": {"name": "After Save", "summary": "Saved from editor"}
+            }
+        }
+    )
+
+    assert response.status_code == 202
+    assert response.get_json()['regenerate_scheduled']
+    _wait_for_regeneration(portfolio_id)
+
+    get_data = client.get(f'/api/portfolio/{portfolio_id}').get_json()
+    assert get_data['data']['name'] == 'After Save'
+    assert get_data['data']['bio'] == 'Saved from editor'
+    assert 'full_replace' not in get_data['data']
+
+
+def test_cors_preflight(client):
+    """Test that cross-origin preflight requests to the API are allowed."""
+    response = client.options(
+        '/api/generate',
+        headers={'Origin': 'https://jobsmatch.example', 'Access-Control-Request-Method': 'POST'}
+    )
+
+    assert response.status_code == 200
+    assert response.headers.get('Access-Control-Allow-Origin')
+    assert 'POST' in response.headers['Access-Control-Allow-Methods']
+
+
+# Integration workflows
+
+def test_complete_workflow(client, sample_portfolio):
+    """Test complete workflow on the shared portfolio: get, update, get again, validate."""
+    portfolio_id = sample_portfolio
+
+    assert client.get(f'/api/portfolio/{portfolio_id}').status_code == 200
+
+    update_response = client.put(
+        f'/api/portfolio/{portfolio_id}',
+        json={"name": "Updated Workflow Test", "regenerate": False}
+    )
+    assert update_response.status_code == 200
+    assert client.get(f'/api/portfolio/{portfolio_id}').get_json()['data']['name'] == 'Updated Workflow Test'
+
+    validate_response = client.post(f'/api/portfolio/{portfolio_id}/validate')
+    assert validate_response.status_code == 200
+    assert validate_response.get_json()['status'] == 'validated'
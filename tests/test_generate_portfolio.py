@@ -1,330 +1,448 @@
-import json
-import tempfile
-import unittest
+import io
+import os
+import zipfile
 from pathlib import Path
 
-from generate_portfolio import generate_portfolio, mark_site_validated, generate_astro_portfolio
+import pytest
+from msgspec import msgpack
 
+from generate_portfolio import generate_portfolio, generate_many, mark_site_validated, generate_astro_portfolio
+from generate_portfolio import _escape_text_cached, _load_json, _sanitize_text
 
-class GeneratePortfolioTest(unittest.TestCase):
-    def test_generates_static_site_with_decap_and_netlify_files(self) -> None:
-        user_data = {
-            "name": "Alice <Dev>",
-            "bio": "Backend engineer",
-            "projects": [{"title": "Proj 1", "description": "Desc", "image": "img.png"}],
-        }
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(user_data, output_dir=temp_dir)
-            output = Path(result["path"])
-
-            self.assertTrue((output / "index.html").exists())
-            self.assertTrue((output / "styles" / "main.css").exists())
-            self.assertTrue((output / "admin" / "index.html").exists())
-            self.assertTrue((output / "admin" / "config.yml").exists())
-            self.assertTrue((output / "netlify.toml").exists())
-            self.assertTrue((output / "data" / "portfolio_document.json").exists())
-            self.assertTrue((output / "data" / "portfolio_sql_projection.json").exists())
-            self.assertTrue((output / "data" / "workflow_state.json").exists())
-
-            html_content = (output / "index.html").read_text(encoding="utf-8")
-            self.assertIn("Alice &lt;Dev&gt;", html_content)
-
-            data_content = json.loads((output / "data" / "portfolio.json").read_text(encoding="utf-8"))
-            self.assertEqual("Alice &lt;Dev&gt;", data_content["name"])
-            self.assertEqual("Proj 1", data_content["projects"][0]["title"])
-
-            document_content = json.loads((output / "data" / "portfolio_document.json").read_text(encoding="utf-8"))
-            self.assertIn("portfolio_id", document_content)
-            self.assertIn("project_id", document_content["projects"][0])
-
-            sql_projection = json.loads((output / "data" / "portfolio_sql_projection.json").read_text(encoding="utf-8"))
-            self.assertEqual(document_content["portfolio_id"], sql_projection["portfolios"][0]["portfolio_id"])
-            self.assertEqual(document_content["projects"][0]["project_id"], sql_projection["projects"][0]["project_id"])
-
-            workflow_state = json.loads((output / "data" / "workflow_state.json").read_text(encoding="utf-8"))
-            self.assertEqual("draft", workflow_state["status"])
-            self.assertEqual("hybrid", workflow_state["site_template"])
-
-    def test_supports_design_theme_selection(self) -> None:
-        user_data = {"name": "Theme User", "bio": "Bio", "projects": []}
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(user_data, output_dir=temp_dir, design_theme="modern")
-            self.assertEqual("modern", result["design_theme"])
-            css_content = (Path(temp_dir) / "styles" / "main.css").read_text(encoding="utf-8")
-            self.assertIn("linear-gradient(135deg, var(--primary-color), var(--secondary-color))", css_content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(user_data, output_dir=temp_dir, design_theme="artistic")
-            self.assertEqual("artistic", result["design_theme"])
-            css_content = (Path(temp_dir) / "styles" / "main.css").read_text(encoding="utf-8")
-            self.assertIn("clip-path: polygon(0 0, 100% 0, 100% 90%, 0 100%);", css_content)
-
-    def test_accepts_cv_augmented_input_format(self) -> None:
-        cv_data = {
-            "basics": {
-                "name": "Marie Curie",
-                "summary": "Data scientist",
-                "label": "Senior Data Scientist",
-                "email": "marie@example.com",
-                "phone": "+33 6 12 34 56 78",
-                "image": "https://example.com/marie.jpg",
-                "location": {
-                    "address": "1 rue des Sciences",
-                    "postalCode": "75005",
-                    "city": "Paris",
-                    "region": "IDF",
-                    "countryCode": "FR",
-                },
-                "profiles": [{"network": "LinkedIn", "url": "https://linkedin.com/in/marie"}],
-            },
-            "work": [
-                {
-                    "name": "LabX",
-                    "position": "ML Engineer",
-                    "summary": "Built ranking models",
-                    "highlights": ["Improved precision", "Reduced latency"],
-                }
-            ],
-            "education": [
-                {
-                    "institution": "Sorbonne",
-                    "studyType": "Master",
-                    "area": "Data Science",
-                    "startDate": "2018",
-                    "endDate": "2020",
-                    "score": "16/20",
-                }
-            ],
-            "skills": [{"name": "Python", "keywords": ["Pandas", "Scikit-learn"]}],
-            "projects": [{"name": "Matching API", "description": "API for recommendations", "image": ""}],
+
+def _collect(root):
+    """Relative POSIX paths of every file under ``root``, from one os.walk (scandir) pass."""
+    files = set()
+    for directory, _, names in os.walk(root):
+        prefix = os.path.relpath(directory, root).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        files.update(prefix + name for name in names)
+    return files
+
+
+def _missing(haystack, needles):
+    """Needles absent from ``haystack``; a failure lists all of them, not just the first."""
+    return {needle for needle in needles if needle not in haystack}
+
+
+def _read_json(path):
+    # Same loader as the generator: orjson when installed, json otherwise (both take bytes)
+    return _load_json(Path(path).read_bytes())
+
+
+def test_generates_static_site_with_decap_and_netlify_files(tmp_path) -> None:
+    user_data = {
+        "name": "Alice <Dev>",
+        "bio": "Backend engineer",
+        "projects": [{"title": "Proj 1", "description": "Desc", "image": "img.png"}],
+    }
+    result = generate_portfolio(user_data, output_dir=str(tmp_path), emit_sql_projection=True)
+    output = Path(result["path"])
+
+    # One tree walk instead of a stat per expected file; a failure shows the missing set
+    found = _collect(output)
+    required = {
+        "index.html",
+        "styles/main.css",
+        "admin/index.html",
+        "admin/config.yml",
+        "netlify.toml",
+        "data/portfolio.json",
+        "data/portfolio_document.json",
+        "data/portfolio_sql_projection.json",
+        "data/workflow_state.json",
+    }
+    assert required - found == set()
+
+    # One directory listing for all the JSON outputs
+    with os.scandir(output / "data") as entries:
+        docs = {entry.name: _read_json(entry.path) for entry in entries if entry.name.endswith(".json")}
+
+    html_content = (output / "index.html").read_text(encoding="utf-8")
+    assert "Alice &lt;Dev&gt;" in html_content
+
+    data_content = docs["portfolio.json"]
+    assert data_content["name"] == "Alice &lt;Dev&gt;"
+    assert data_content["projects"][0]["title"] == "Proj 1"
+
+    document_content = docs["portfolio_document.json"]
+    assert "portfolio_id" in document_content
+    assert "project_id" in document_content["projects"][0]
+
+    sql_projection = docs["portfolio_sql_projection.json"]
+    assert sql_projection["portfolios"][0]["portfolio_id"] == document_content["portfolio_id"]
+    assert sql_projection["projects"][0]["project_id"] == document_content["projects"][0]["project_id"]
+
+    workflow_state = docs["workflow_state.json"]
+    assert workflow_state["status"] == "draft"
+    assert workflow_state["site_template"] == "hybrid"
+
+
+def test_regeneration_replaces_files_atomically(tmp_path) -> None:
+    generate_portfolio({"name": "Before", "projects": []}, output_dir=str(tmp_path))
+    portfolio_json = tmp_path / "data" / "portfolio.json"
+    with portfolio_json.open("rb") as previous:
+        generate_portfolio({"name": "After", "projects": []}, output_dir=str(tmp_path))
+        # A reader holding the old file still gets it whole, not truncated
+        assert _load_json(previous.read())["name"] == "Before"
+
+    assert _read_json(portfolio_json)["name"] == "After"
+    assert not [path for path in _collect(tmp_path) if path.endswith(".tmp")]
+
+
+def test_only_short_text_is_memoized_when_escaped() -> None:
+    long_bio = "<b>Bio</b> " + "x" * 1000
+    before = _escape_text_cached.cache_info().currsize
+    assert _sanitize_text(long_bio) == "&lt;b&gt;Bio&lt;/b&gt; " + "x" * 1000
+    assert _escape_text_cached.cache_info().currsize == before
+
+    assert _sanitize_text("C++ & <Rust> [unique-skill]") == "C++ &amp; &lt;Rust&gt; [unique-skill]"
+    assert _escape_text_cached.cache_info().currsize == before + 1
+
+
+def test_sql_projection_is_opt_in(tmp_path) -> None:
+    user_data = {"name": "Projection User", "bio": "Bio", "projects": [{"title": "Proj", "description": "", "image": ""}]}
+    site_dir = tmp_path / "json"
+    generate_portfolio(user_data, output_dir=str(site_dir))
+    assert not (site_dir / "data" / "portfolio_sql_projection.json").exists()
+
+    site_dir = tmp_path / "msgpack"
+    result = generate_portfolio(user_data, output_dir=str(site_dir), emit_sql_projection=True, sql_format="msgpack")
+    sql_projection = msgpack.decode((site_dir / "data" / "portfolio_sql_projection.msgpack").read_bytes())
+    assert sql_projection["portfolios"][0]["portfolio_id"] == result["portfolio_id"]
+    assert sql_projection["projects"][0]["title"] == "Proj"
+
+
+def test_generate_many_builds_one_site_per_payload(tmp_path) -> None:
+    payloads = [
+        {"user_id": "alice", "name": "Alice", "bio": "Bio A", "projects": []},
+        {"basics": {"name": "Bob", "summary": "Bio B"}},
+    ]
+    results = generate_many(payloads, output_root=str(tmp_path), workers=2, design_theme="modern")
+
+    root = tmp_path.resolve()
+    assert [result["path"] for result in results] == [str(root / "alice"), str(root / "portfolio-1")]
+    assert {result["design_theme"] for result in results} == {"modern"}
+    assert "Bob" in (Path(results[1]["path"]) / "index.html").read_text(encoding="utf-8")
+
+
+def test_generate_many_keeps_colliding_ids_apart(tmp_path) -> None:
+    payloads = [
+        {"user_id": "alice", "name": "Alice 0", "projects": []},
+        {"user_id": "alice", "name": "Alice 1", "projects": []},
+        {"user_id": "a/lice", "name": "Alice 2", "projects": []},
+        {"user_id": "portfolio-4", "name": "Squatter", "projects": []},
+        {"name": "No id", "projects": []},
+    ]
+    results = generate_many(payloads, output_root=str(tmp_path), workers=2)
+
+    names = [Path(result["path"]).name for result in results]
+    assert names == ["alice", "alice-1", "alice-2", "portfolio-4", "portfolio-4-4"]
+    for payload, result in zip(payloads, results):
+        assert _read_json(Path(result["path"]) / "data" / "portfolio.json")["name"] == payload["name"]
+
+
+def test_archive_mode_returns_zip_without_touching_disk(tmp_path) -> None:
+    user_data = {"name": "Zip User", "bio": "Bio", "projects": [{"title": "P1", "description": "D1"}]}
+    output_dir = tmp_path / "site"
+    result = generate_portfolio(user_data, output_dir=str(output_dir), as_archive=True)
+
+    assert not output_dir.exists()
+    assert "path" not in result
+    with zipfile.ZipFile(io.BytesIO(result["archive"])) as archive:
+        assert set(archive.namelist()) == {
+            "index.html",
+            "styles/main.css",
+            "admin/index.html",
+            "admin/config.yml",
+            "data/portfolio.json",
+            "data/portfolio_document.json",
+            "data/workflow_state.json",
+            "netlify.toml",
         }
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(cv_data, output_dir=temp_dir)
-            output = Path(result["path"])
-
-            data_content = json.loads((output / "data" / "portfolio.json").read_text(encoding="utf-8"))
-            self.assertEqual("Marie Curie", data_content["name"])
-            self.assertEqual("Data scientist", data_content["bio"])
-            self.assertEqual(2, len(data_content["projects"]))
-            self.assertEqual("Matching API", data_content["projects"][0]["title"])
-            self.assertEqual("ML Engineer - LabX", data_content["projects"][1]["title"])
-            self.assertEqual("https://example.com/marie.jpg", data_content["photo_url"])
-            self.assertIn("marie@example.com", data_content["contact_line"])
-            self.assertEqual("1 rue des Sciences | 75005 Paris | IDF | FR", data_content["address_line"])
-            self.assertEqual("Sorbonne", data_content["education"][0]["institution"])
-
-            html_content = (output / "index.html").read_text(encoding="utf-8")
-            self.assertIn("Senior Data Scientist", html_content)
-            self.assertIn("LinkedIn", html_content)
-            self.assertIn("Master - Data Science", html_content)
-
-    def test_supports_template_selection_and_validation_state(self) -> None:
-        cv_data = {
-            "basics": {"name": "Jean Dupont", "summary": "Ingénieur logiciel"},
-            "work": [{"name": "Startup", "position": "Backend Engineer", "summary": "Built APIs"}],
-            "projects": [{"name": "Portfolio UI", "description": "Showcase app", "image": ""}],
+        assert "Zip User" in archive.read("index.html").decode("utf-8")
+        assert _load_json(archive.read("data/workflow_state.json"))["portfolio_id"] == result["portfolio_id"]
+
+
+# Stylesheets are written as raw bytes, so markers are matched without decoding
+_THEME_MARKERS = {
+    "modern": b"linear-gradient(135deg, var(--primary-color), var(--secondary-color))",
+    "artistic": b"clip-path: polygon(0 0, 100% 0, 100% 90%, 0 100%);",
+}
+
+
+@pytest.mark.parametrize("theme", sorted(_THEME_MARKERS))
+def test_supports_design_theme_selection(tmp_path, theme) -> None:
+    user_data = {"name": "Theme User", "bio": "Bio", "projects": []}
+    result = generate_portfolio(user_data, output_dir=str(tmp_path), design_theme=theme)
+    assert result["design_theme"] == theme
+    assert _THEME_MARKERS[theme] in (tmp_path / "styles" / "main.css").read_bytes()
+
+
+_CV_AUGMENTED_DATA = {
+    "basics": {
+        "name": "Marie Curie",
+        "summary": "Data scientist",
+        "label": "Senior Data Scientist",
+        "email": "marie@example.com",
+        "phone": "+33 6 12 34 56 78",
+        "image": "https://example.com/marie.jpg",
+        "location": {
+            "address": "1 rue des Sciences",
+            "postalCode": "75005",
+            "city": "Paris",
+            "region": "IDF",
+            "countryCode": "FR",
+        },
+        "profiles": [{"network": "LinkedIn", "url": "https://linkedin.com/in/marie"}],
+    },
+    "work": [
+        {
+            "name": "LabX",
+            "position": "ML Engineer",
+            "summary": "Built ranking models",
+            "highlights": ["Improved precision", "Reduced latency"],
         }
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(cv_data, output_dir=temp_dir, site_template="cv")
-            output = Path(result["path"])
-
-            data_content = json.loads((output / "data" / "portfolio.json").read_text(encoding="utf-8"))
-            self.assertEqual(1, len(data_content["projects"]))
-            self.assertEqual("Backend Engineer - Startup", data_content["projects"][0]["title"])
-
-            html_content = (output / "index.html").read_text(encoding="utf-8")
-            self.assertIn("<h2>Expériences</h2>", html_content)
-
-            validation_result = mark_site_validated(str(output))
-            self.assertEqual("validated", validation_result["status"])
-            workflow_state = json.loads((output / "data" / "workflow_state.json").read_text(encoding="utf-8"))
-            self.assertEqual("validated", workflow_state["status"])
-            self.assertIn("validated_at", workflow_state)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            generate_portfolio(cv_data, output_dir=temp_dir, site_template="portfolio")
-            html_content = (Path(temp_dir) / "index.html").read_text(encoding="utf-8")
-            self.assertIn("<h2>Réalisations</h2>", html_content)
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            generate_portfolio(cv_data, output_dir=temp_dir, site_template="hybrid")
-            html_content = (Path(temp_dir) / "index.html").read_text(encoding="utf-8")
-            self.assertIn("<h2>Réalisations & Expériences</h2>", html_content)
-
-    def test_manual_editor_json_format_compatibility(self) -> None:
-        """Test that JSON format from manual editor works with portfolio generator."""
-        manual_editor_data = {
-            "basics": {
-                "name": "Test User",
-                "summary": "Test bio summary",
-                "label": "Test Label",
-                "image": "https://example.com/photo.jpg",
-                "email": "test@example.com",
-                "phone": "+33 6 00 00 00 00",
-                "location": {
-                    "address": "1 rue Test, 75001 Paris"
-                },
-                "profiles": [
-                    {"network": "LinkedIn", "url": "https://linkedin.com/in/test"}
-                ]
-            },
-            "skills": [
-                {"name": "Skill 1"},
-                {"name": "Skill 2"}
-            ],
-            "education": [
-                {
-                    "institution": "Test University",
-                    "studyType": "Master",
-                    "area": "Computer Science",
-                    "startDate": "2020",
-                    "endDate": "2022",
-                    "score": "Excellent"
-                }
-            ],
-            "projects": [
-                {
-                    "name": "Test Project",
-                    "description": "Test project description",
-                    "image": "https://example.com/project.jpg"
-                }
-            ]
+    ],
+    "education": [
+        {
+            "institution": "Sorbonne",
+            "studyType": "Master",
+            "area": "Data Science",
+            "startDate": "2018",
+            "endDate": "2020",
+            "score": "16/20",
         }
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(manual_editor_data, output_dir=temp_dir)
-            output = Path(result["path"])
-            
-            # Verify all files are generated
-            self.assertTrue((output / "index.html").exists())
-            self.assertTrue((output / "data" / "portfolio.json").exists())
-            
-            # Verify data is correctly processed
-            data_content = json.loads((output / "data" / "portfolio.json").read_text(encoding="utf-8"))
-            self.assertEqual("Test User", data_content["name"])
-            self.assertEqual("Test bio summary", data_content["bio"])
-            self.assertEqual("Test Label", data_content["headline"])
-            self.assertIn("test@example.com", data_content["contact_line"])
-            self.assertEqual("1 rue Test, 75001 Paris", data_content["address_line"])
-            self.assertEqual(1, len(data_content["profiles"]))
-            self.assertEqual("LinkedIn", data_content["profiles"][0]["network"])
-            self.assertEqual(2, len(data_content["skills"]))
-            self.assertIn("Skill 1", data_content["skills"])
-            self.assertEqual(1, len(data_content["education"]))
-            self.assertEqual("Test University", data_content["education"][0]["institution"])
-            self.assertEqual(1, len(data_content["projects"]))
-            self.assertEqual("Test Project", data_content["projects"][0]["title"])
-            
-            # Verify HTML contains the data
-            html_content = (output / "index.html").read_text(encoding="utf-8")
-            self.assertIn("Test User", html_content)
-            self.assertIn("Test Label", html_content)
-            self.assertIn("Test bio summary", html_content)
-            self.assertIn("LinkedIn", html_content)
-            self.assertIn("Skill 1", html_content)
-            self.assertIn("Test University", html_content)
-            self.assertIn("Test Project", html_content)
-
-    def test_manual_editor_handles_missing_required_fields(self) -> None:
-        """Test that generator handles incomplete data from manual editor gracefully."""
-        # Test with missing name
-        incomplete_data = {
-            "basics": {
-                "summary": "Bio without name"
-            }
+    ],
+    "skills": [{"name": "Python", "keywords": ["Pandas", "Scikit-learn"]}],
+    "projects": [{"name": "Matching API", "description": "API for recommendations", "image": ""}],
+}
+
+
+def test_accepts_cv_augmented_input_format(tmp_path) -> None:
+    result = generate_portfolio(_CV_AUGMENTED_DATA, output_dir=str(tmp_path))
+    output = Path(result["path"])
+
+    data_content = _read_json(output / "data" / "portfolio.json")
+    assert data_content["name"] == "Marie Curie"
+    assert data_content["bio"] == "Data scientist"
+    assert len(data_content["projects"]) == 2
+    assert data_content["projects"][0]["title"] == "Matching API"
+    assert data_content["projects"][1]["title"] == "ML Engineer - LabX"
+    assert data_content["photo_url"] == "https://example.com/marie.jpg"
+    assert "marie@example.com" in data_content["contact_line"]
+    assert data_content["address_line"] == "1 rue des Sciences | 75005 Paris | IDF | FR"
+    assert data_content["education"][0]["institution"] == "Sorbonne"
+
+    html_content = (output / "index.html").read_text(encoding="utf-8")
+    assert _missing(html_content, ("Senior Data Scientist", "LinkedIn", "Master - Data Science")) == set()
+
+
+@pytest.fixture(scope="module")
+def cv_data():
+    return {
+        "basics": {"name": "Jean Dupont", "summary": "Ingénieur logiciel"},
+        "work": [{"name": "Startup", "position": "Backend Engineer", "summary": "Built APIs"}],
+        "projects": [{"name": "Portfolio UI", "description": "Showcase app", "image": ""}],
+    }
+
+
+@pytest.mark.parametrize(
+    "template, heading",
+    [
+        ("cv", "<h2>Expériences</h2>"),
+        ("portfolio", "<h2>Réalisations</h2>"),
+        ("hybrid", "<h2>Réalisations & Expériences</h2>"),
+    ],
+)
+def test_template_selection_sets_section_heading(tmp_path, cv_data, template, heading) -> None:
+    generate_portfolio(cv_data, output_dir=str(tmp_path), site_template=template)
+    assert heading in (tmp_path / "index.html").read_text(encoding="utf-8")
+
+
+def test_cv_template_lists_work_and_supports_validation_state(tmp_path, cv_data) -> None:
+    result = generate_portfolio(cv_data, output_dir=str(tmp_path), site_template="cv")
+    output = Path(result["path"])
+    data_dir = output / "data"
+
+    data_content = _read_json(data_dir / "portfolio.json")
+    assert len(data_content["projects"]) == 1
+    assert data_content["projects"][0]["title"] == "Backend Engineer - Startup"
+
+    validation_result = mark_site_validated(str(output))
+    assert validation_result["status"] == "validated"
+    workflow_state = _read_json(data_dir / "workflow_state.json")
+    assert workflow_state["status"] == "validated"
+    assert "validated_at" in workflow_state
+
+
+_MANUAL_EDITOR_DATA = {
+    "basics": {
+        "name": "Test User",
+        "summary": "Test bio summary",
+        "label": "Test Label",
+        "image": "https://example.com/photo.jpg",
+        "email": "test@example.com",
+        "phone": "+33 6 00 00 00 00",
+        "location": {
+            "address": "1 rue Test, 75001 Paris"
+        },
+        "profiles": [
+            {"network": "LinkedIn", "url": "https://linkedin.com/in/test"}
+        ]
+    },
+    "skills": [
+        {"name": "Skill 1"},
+        {"name": "Skill 2"}
+    ],
+    "education": [
+        {
+            "institution": "Test University",
+            "studyType": "Master",
+            "area": "Computer Science",
+            "startDate": "2020",
+            "endDate": "2022",
+            "score": "Excellent"
         }
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(incomplete_data, output_dir=temp_dir)
-            data_content = json.loads((Path(temp_dir) / "data" / "portfolio.json").read_text(encoding="utf-8"))
-            # Should still generate with sanitized empty name
-            self.assertIsNotNone(data_content["name"])
-        
-        # Test with missing bio/summary
-        incomplete_data2 = {
-            "basics": {
-                "name": "Test User"
-            }
+    ],
+    "projects": [
+        {
+            "name": "Test Project",
+            "description": "Test project description",
+            "image": "https://example.com/project.jpg"
         }
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(incomplete_data2, output_dir=temp_dir)
-            data_content = json.loads((Path(temp_dir) / "data" / "portfolio.json").read_text(encoding="utf-8"))
-            # Should still generate with sanitized empty bio
-            self.assertIsNotNone(data_content["bio"])
-        
-        # Test with empty basics
-        incomplete_data3 = {
-            "basics": {}
+    ]
+}
+
+
+def test_manual_editor_json_format_compatibility(tmp_path) -> None:
+    """Test that JSON format from manual editor works with portfolio generator."""
+    result = generate_portfolio(_MANUAL_EDITOR_DATA, output_dir=str(tmp_path))
+    output = Path(result["path"])
+    portfolio_json = output / "data" / "portfolio.json"
+
+    # Verify all files are generated
+    assert (output / "index.html").exists()
+    assert portfolio_json.exists()
+
+    # Verify data is correctly processed
+    data_content = _read_json(portfolio_json)
+    assert data_content["name"] == "Test User"
+    assert data_content["bio"] == "Test bio summary"
+    assert data_content["headline"] == "Test Label"
+    assert "test@example.com" in data_content["contact_line"]
+    assert data_content["address_line"] == "1 rue Test, 75001 Paris"
+    assert len(data_content["profiles"]) == 1
+    assert data_content["profiles"][0]["network"] == "LinkedIn"
+    assert len(data_content["skills"]) == 2
+    assert "Skill 1" in data_content["skills"]
+    assert len(data_content["education"]) == 1
+    assert data_content["education"][0]["institution"] == "Test University"
+    assert len(data_content["projects"]) == 1
+    assert data_content["projects"][0]["title"] == "Test Project"
+
+    # Verify HTML contains the data
+    html_content = (output / "index.html").read_text(encoding="utf-8")
+    expected = ("Test User", "Test Label", "Test bio summary", "LinkedIn", "Skill 1", "Test University", "Test Project")
+    assert _missing(html_content, expected) == set()
+
+
+def test_manual_editor_handles_missing_required_fields(tmp_path) -> None:
+    """Test that generator handles incomplete data from manual editor gracefully."""
+    # Test with missing name
+    incomplete_data = {
+        "basics": {
+            "summary": "Bio without name"
         }
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_portfolio(incomplete_data3, output_dir=temp_dir)
-            self.assertTrue((Path(temp_dir) / "index.html").exists())
-
-    def test_generates_astro_project_structure(self) -> None:
-        """Test that Astro portfolio generation creates proper project structure."""
-        user_data = {
-            "name": "Astro User",
-            "bio": "Testing Astro generation",
-            "projects": [{"title": "Astro Project", "description": "Test Astro", "image": ""}],
+    }
+
+    site_dir = tmp_path / "no-name"
+    result = generate_portfolio(incomplete_data, output_dir=str(site_dir))
+    data_content = _read_json(site_dir / "data" / "portfolio.json")
+    # Should still generate with sanitized empty name
+    assert data_content["name"] is not None
+
+    # Test with missing bio/summary
+    incomplete_data2 = {
+        "basics": {
+            "name": "Test User"
         }
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_astro_portfolio(user_data, output_dir=temp_dir)
-            output = Path(result["path"])
-            
-            # Check Astro project structure
-            self.assertEqual(result["type"], "astro")
-            self.assertEqual(result["status"], "generated")
-            self.assertIn("npm", result["dev_command"])
-            self.assertIn("build", result["build_command"])
-            
-            # Check Astro files exist
-            self.assertTrue((output / "package.json").exists())
-            self.assertTrue((output / "astro.config.mjs").exists())
-            self.assertTrue((output / ".gitignore").exists())
-            self.assertTrue((output / "README.md").exists())
-            
-            # Check Astro src structure
-            self.assertTrue((output / "src" / "layouts" / "Layout.astro").exists())
-            self.assertTrue((output / "src" / "pages" / "index.astro").exists())
-            self.assertTrue((output / "src" / "content" / "portfolio" / "data.json").exists())
-            
-            # Check public folder
-            self.assertTrue((output / "public" / "styles" / "main.css").exists())
-            
-            # Verify data content
-            data_content = json.loads((output / "src" / "content" / "portfolio" / "data.json").read_text(encoding="utf-8"))
-            self.assertEqual("Astro User", data_content["name"])
-            self.assertEqual("Testing Astro generation", data_content["bio"])
-            self.assertEqual(1, len(data_content["projects"]))
-            self.assertEqual("Astro Project", data_content["projects"][0]["title"])
-    
-    def test_astro_supports_different_templates_and_themes(self) -> None:
-        """Test that Astro generation supports different templates and themes."""
-        user_data = {
-            "basics": {
-                "name": "Theme Test",
-                "summary": "Testing themes"
-            }
+    }
+
+    site_dir = tmp_path / "no-bio"
+    result = generate_portfolio(incomplete_data2, output_dir=str(site_dir))
+    data_content = _read_json(site_dir / "data" / "portfolio.json")
+    # Should still generate with sanitized empty bio
+    assert data_content["bio"] is not None
+
+    # Test with empty basics
+    incomplete_data3 = {
+        "basics": {}
+    }
+
+    site_dir = tmp_path / "empty-basics"
+    result = generate_portfolio(incomplete_data3, output_dir=str(site_dir))
+    assert (site_dir / "index.html").exists()
+
+
+_ASTRO_EXPECTED = frozenset({
+    "package.json",
+    "astro.config.mjs",
+    ".gitignore",
+    "README.md",
+    "src/layouts/Layout.astro",
+    "src/pages/index.astro",
+    "src/content/portfolio/data.json",
+    "public/styles/main.css",
+})
+
+
+def test_generates_astro_project_structure(tmp_path) -> None:
+    """Test that Astro portfolio generation creates proper project structure."""
+    user_data = {
+        "name": "Astro User",
+        "bio": "Testing Astro generation",
+        "projects": [{"title": "Astro Project", "description": "Test Astro", "image": ""}],
+    }
+    result = generate_astro_portfolio(user_data, output_dir=str(tmp_path))
+    output = Path(result["path"])
+
+    # Check Astro project structure
+    assert result["type"] == "astro"
+    assert result["status"] == "generated"
+    assert "npm" in result["dev_command"]
+    assert "build" in result["build_command"]
+
+    # Project files, src structure and public folder
+    assert _ASTRO_EXPECTED - _collect(output) == set()
+
+    # Verify data content
+    data_content = _read_json(output / "src" / "content" / "portfolio" / "data.json")
+    assert data_content["name"] == "Astro User"
+    assert data_content["bio"] == "Testing Astro generation"
+    assert len(data_content["projects"]) == 1
+    assert data_content["projects"][0]["title"] == "Astro Project"
+
+
+def test_astro_supports_different_templates_and_themes(tmp_path) -> None:
+    """Test that Astro generation supports different templates and themes."""
+    user_data = {
+        "basics": {
+            "name": "Theme Test",
+            "summary": "Testing themes"
         }
-        
-        # Test with modern theme
-        with tempfile.TemporaryDirectory() as temp_dir:
-            result = generate_astro_portfolio(
-                user_data,
-                output_dir=temp_dir,
-                site_template="portfolio",
-                design_theme="modern"
-            )
-            self.assertEqual("modern", result["design_theme"])
-            self.assertEqual("portfolio", result["site_template"])
-            
-            # Check that modern CSS was copied
-            output = Path(result["path"])
-            css_content = (output / "public" / "styles" / "main.css").read_text(encoding="utf-8")
-            self.assertIn("linear-gradient", css_content)  # Modern theme has gradients
-
-
-if __name__ == "__main__":
-    unittest.main()
+    }
+
+    # Test with modern theme
+    result = generate_astro_portfolio(
+        user_data,
+        output_dir=str(tmp_path),
+        site_template="portfolio",
+        design_theme="modern"
+    )
+    assert result["design_theme"] == "modern"
+    assert result["site_template"] == "portfolio"
+
+    # Check that modern CSS was copied
+    output = Path(result["path"])
+    assert _THEME_MARKERS["modern"] in (output / "public" / "styles" / "main.css").read_bytes()